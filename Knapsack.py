@@ -1,9 +1,18 @@
+import json
 import math
+import multiprocessing
+import os
 import random
+import struct
+import zipfile
 import numpy as np
 import tkinter as tk
+import tkinter.messagebox
 from tkinter import *
 import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
 
 num_items = 100
 frac_target = 0.7
@@ -18,8 +27,28 @@ num_generations = 2000  # Increased number of generations
 pop_size = 100  # Population size
 elitism_count = 5  # Number of elites to carry over
 mutation_rate = 0.05  # Increased mutation rate
+seeded_fraction = 0.2  # Share of the initial population built by heuristics
+seed_noise = 0.3  # Relative noise on item values for randomized greedy seeds
+use_repair = False  # Repair over-target genomes after every generation
 
-sleep_time = 0.01  # Reduced sleep time for faster iterations
+frame_rate = 30  # UI redraws per second while the solver is running
+
+checkpoint_file = "knapsack_checkpoint.npz"  # Written by the UI while running
+checkpoint_interval = 100  # Generations between checkpoints
+
+island_count = os.cpu_count() or 1  # Populations evolved in parallel processes
+migration_interval = 25  # Generations between migrations
+migration_size = 2  # Best genomes each island sends per migration
+island_topology = "ring"  # "ring" or "full" (every island sees every other)
+
+packed_chunk_bytes = 1 << 24  # Temporary size per chunk when scoring packed genomes
+
+exact_method = "auto"  # "auto", "dp" (bitset DP) or "mitm" (meet in the middle)
+mitm_max_items = 40  # Largest instance meet in the middle is used for
+dp_max_bytes = 1 << 28  # Memory allowed for the reachable-sum bitsets the DP keeps
+
+fitness_cache_size = 1 << 16  # Genomes remembered by a FitnessCache
+chunk_genes = 1 << 22  # Genes handled at once when building seeds or repairing
 
 
 def random_rgb_color():
@@ -31,9 +60,12 @@ def random_rgb_color():
 
 
 class Item:
-    def __init__(self):
-        self.value = random.randint(min_value, max_value)
+    def __init__(self, value):
+        self.value = value
         self.color = random_rgb_color()
+        self.active = False
+        self.text_id = None
+        self.rect_id = None
         self.x = 0
         self.y = 0
         self.w = 0
@@ -46,31 +78,1131 @@ class Item:
         self.h = h
 
     def draw(self, canvas, active=False):
-        canvas.create_text(
+        # Create the canvas items once; later updates go through set_active
+        self.text_id = canvas.create_text(
             self.x + self.w + item_padding + stroke_width * 2,
             self.y + self.h / 2,
             text=f"{self.value}",
         )
-        if active:
-            canvas.create_rectangle(
-                self.x,
-                self.y,
-                self.x + self.w,
-                self.y + self.h,
-                fill=self.color,
-                outline=self.color,
-                width=stroke_width,
+        self.rect_id = canvas.create_rectangle(
+            self.x,
+            self.y,
+            self.x + self.w,
+            self.y + self.h,
+            fill=self.color if active else "",
+            outline=self.color,
+            width=stroke_width,
+        )
+        self.active = active
+
+    def set_active(self, canvas, active):
+        if active != self.active:
+            canvas.itemconfig(self.rect_id, fill=self.color if active else "")
+            self.active = active
+
+
+def generate_item_values(count=num_items, rng=None, low=min_value, high=max_value):
+    # Unique item values drawn in bulk without replacement from [low, high]
+    span = high - low + 1
+    if count > span:
+        raise ValueError(f"Cannot draw {count} unique values from [{low}, {high}].")
+    rng = np.random.default_rng(rng)
+    return rng.choice(span, size=count, replace=False) + low
+
+
+def generate_target(item_values, rng=None, frac=frac_target):
+    # Sum of a random subset, so every target has an exact solution
+    rng = np.random.default_rng(rng)
+    picked = rng.choice(len(item_values), int(len(item_values) * frac), replace=False)
+    return int(item_values[picked].sum())
+
+
+def generate_instances(
+    count, size=num_items, seed=None, low=min_value, high=max_value, frac=frac_target
+):
+    # Stream (item_values, target) pairs without building any Item objects
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        item_values = generate_item_values(size, rng, low, high)
+        yield item_values, generate_target(item_values, rng, frac)
+
+
+def packed_byte_values(item_values, num_bytes):
+    # table[j, b] is the total value of the items selected by byte value b at
+    # byte position j of a np.packbits genome
+    values = np.zeros(num_bytes * 8, dtype=np.int64)
+    values[: len(item_values)] = item_values
+    bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+    return values.reshape(num_bytes, 8) @ bits.T.astype(np.int64)
+
+
+def fitness_from_totals(total_values, target):
+    # `target` may be a scalar or broadcast against `total_values`
+    diff = np.asarray(total_values, dtype=np.float64) - target
+    # Apply severe penalty for exceeding the target. Fitness is the
+    # difference to target for under-target solutions.
+    return np.abs(diff) + 1000 * (diff > 0)
+
+
+class LatestState:
+    # Single-slot mailbox: the solver thread overwrites the slot with its
+    # latest state and the UI takes whatever is there when it redraws, so
+    # intermediate states are dropped instead of queueing up
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def publish(self, state):
+        with self._lock:
+            self._state = state
+
+    def take(self):
+        with self._lock:
+            state, self._state = self._state, None
+        return state
+
+
+def greedy_fill(item_values, target, orders):
+    # For each row of `orders`, walk the items in that order and take every
+    # item that still fits under the target. Rows are processed together.
+    count = len(orders)
+    genomes = np.zeros((count, len(item_values)), dtype=np.uint8)
+    remaining = np.full(count, target, dtype=np.int64)
+    rows = np.arange(count)
+    smallest = item_values.min(initial=0)
+    for position in range(orders.shape[1]):
+        items = orders[:, position]
+        take = item_values[items] <= remaining
+        remaining -= item_values[items] * take
+        genomes[rows, items] = take
+        if remaining.max() < smallest:
+            break
+    return genomes
+
+
+def relaxation_fill(item_values, target, orders, rng):
+    # The fractional relaxation of subset sum fills items in any order until
+    # one only partly fits. Each row is rounded down, up, or randomly in
+    # proportion to the fractional part, cycling through the three.
+    count = len(orders)
+    filled = np.cumsum(item_values[orders], axis=1)
+    whole = np.sum(filled <= target, axis=1)  # Items that fit completely
+    below = np.where(whole > 0, filled[np.arange(count), np.maximum(whole - 1, 0)], 0)
+    partial = np.minimum(whole, len(item_values) - 1)
+    fraction = (target - below) / item_values[orders[np.arange(count), partial]]
+    rounding = np.arange(count) % 3
+    include = (rounding == 1) | ((rounding == 2) & (rng.random(count) < fraction))
+    include &= whole < len(item_values)
+    taken = np.arange(len(item_values)) < (whole + include)[:, None]
+    genomes = np.zeros((count, len(item_values)), dtype=np.uint8)
+    np.put_along_axis(genomes, orders, taken, axis=1)
+    return genomes
+
+
+def heuristic_seeds(item_values, target, count, rng=None, noise=seed_noise):
+    # Initial genomes from a greedy fill by decreasing value, randomized
+    # greedy fills on noisy values, and rounded fractional relaxations
+    rng = np.random.default_rng(rng)
+    item_values = np.asarray(item_values, dtype=np.int64)
+    genomes = np.empty((count, len(item_values)), dtype=np.uint8)
+    chunk = max(1, chunk_genes // max(len(item_values), 1))
+    num_greedy = (count + 1) // 2
+    for start in range(0, count, chunk):
+        stop = min(start + chunk, count)
+        rows = np.arange(start, stop)
+        greedy = rows[rows < num_greedy]
+        if len(greedy):
+            noisy = item_values * (
+                1 + noise * rng.standard_normal((len(greedy), len(item_values)))
+            )
+            noisy[greedy == 0] = item_values  # Plain greedy, no noise
+            orders = np.argsort(-noisy, axis=1)
+            genomes[greedy] = greedy_fill(item_values, target, orders)
+        relaxed = rows[rows >= num_greedy]
+        if len(relaxed):
+            orders = rng.permuted(
+                np.tile(np.arange(len(item_values)), (len(relaxed), 1)), axis=1
+            )
+            genomes[relaxed] = relaxation_fill(item_values, target, orders, rng)
+    return genomes
+
+
+def repair_genomes(genomes, totals, item_values, target, rng):
+    # Bring over-target genomes to or under the target in place: drop
+    # selected items in random order until the excess is gone, then add back
+    # the smallest unselected items that still fit. Returns the new totals.
+    count = len(genomes)
+    rows = np.arange(count)[:, None]
+    selected = genomes.astype(bool)
+
+    # Unselected items sort last, so the cumulative sum only counts
+    # selected ones; drop up to and including the item that clears the excess
+    keys = np.where(selected, rng.random(genomes.shape), np.inf)
+    order = np.argsort(keys, axis=1)
+    dropped = np.cumsum(item_values[order] * selected[rows, order], axis=1)
+    num_dropped = np.sum(dropped < (totals - target)[:, None], axis=1) + 1
+    drop = np.arange(genomes.shape[1]) < num_dropped[:, None]
+    genomes[rows, order] &= ~drop
+    totals = totals - dropped[np.arange(count), num_dropped - 1]
+
+    # Smallest-first fill: in ascending order the items that fit are a prefix
+    by_value = np.argsort(item_values)
+    free = genomes[:, by_value] == 0
+    added = np.cumsum(item_values[by_value] * free, axis=1)
+    add = free & (added <= (target - totals)[:, None])
+    genomes[:, by_value] |= add
+    return totals + np.sum(item_values[by_value] * add, axis=1)
+
+
+class FitnessCache:
+    # Bounded LRU map from a genome's packed bytes to its fitness. Worth it
+    # when scoring is expensive, e.g. with a custom fitness function, since
+    # elites and a converged population repeat the same genomes.
+    def __init__(self, capacity=fitness_cache_size):
+        self.capacity = capacity
+        self._scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._scores.move_to_end(key)
+        return score
+
+    def put(self, key, score):
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        if len(self._scores) > self.capacity:
+            self._scores.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._scores)
+
+
+def write_checkpoint(path, state, compress=True):
+    # Write to a temporary file first so a crash never leaves a torn
+    # checkpoint behind
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        (np.savez_compressed if compress else np.savez)(f, **state)
+    os.replace(temp_path, path)
+
+
+def mmap_npz_member(path, name):
+    # Memory-map one array of an uncompressed .npz archive copy-on-write, so
+    # pages are only read when touched and writes stay private. Returns None
+    # when the member is compressed.
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        # Skip the zip local file header to reach the .npy data
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", f.read(4))
+        f.seek(name_length + extra_length, os.SEEK_CUR)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="c",
+        shape=shape,
+        offset=offset,
+        order="F" if fortran_order else "C",
+    ).view(np.ndarray)
+
+
+class CheckpointWriter:
+    # Writes solver snapshots on a background thread. Only the newest
+    # pending snapshot is kept, so a slow disk never stalls the solver.
+    # The thread starts on the first submit and ends on close().
+    def __init__(self, path, compress=True):
+        self.path = path
+        self.compress = compress
+        self._condition = threading.Condition()
+        self._state = None
+        self._writing = False
+        self._closing = False
+        self._thread = None
+        self.written = 0
+        self.error = None
+
+    def submit(self, state):
+        with self._condition:
+            self._state = state
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self):
+        # Wait until every submitted snapshot is on disk
+        with self._condition:
+            while self._state is not None or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        # Write whatever is pending, then stop the thread. A later submit
+        # starts a new one.
+        with self._condition:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._condition.notify_all()
+        thread.join()
+        with self._condition:
+            self._thread = None
+            self._closing = False
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._state is None and not self._closing:
+                    self._condition.wait()
+                if self._state is None:
+                    return  # Closing with nothing left to write
+                state, self._state = self._state, None
+                self._writing = True
+            try:
+                write_checkpoint(self.path, state, self.compress)
+                self.written += 1
+            except OSError as e:
+                self.error = e
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+
+class KnapsackResult:
+    def __init__(self, genome, total, fitness, generations, elapsed, method="GA"):
+        self.genome = genome  # Best selection found, one 0/1 entry per item
+        self.total = total  # Sum of the selected item values
+        self.fitness = fitness  # Distance from the target (0 is optimal)
+        self.generations = generations
+        self.elapsed = elapsed  # Wall time in seconds
+        self.method = method
+
+
+def solve_exact_dp(item_values, target):
+    # Bitset DP over reachable sums: bit s of `reachable` is set when some
+    # subset of the items seen so far adds up to s. Sums above the target are
+    # kept up to the largest item, which is enough to find the smallest
+    # reachable sum over the target.
+    num_values = len(item_values)
+    limit = target + int(max(item_values, default=0)) + 1
+    # Only the bitset before every `stride`-th item is kept; the ones in
+    # between are recomputed a block at a time while walking back, so about
+    # 2 * sqrt(n) bitsets are held at once
+    stride = max(math.isqrt(num_values), 1)
+    if (-(-num_values // stride) + stride) * limit // 8 > dp_max_bytes:
+        raise ValueError("Instance is too large for the exact DP solver.")
+    sum_mask = (1 << limit) - 1
+    reachable = 1
+    saved = []
+    for i, value in enumerate(item_values):
+        if i % stride == 0:
+            saved.append(reachable)
+        reachable = (reachable | (reachable << int(value))) & sum_mask
+
+    best_under = (reachable & ((1 << (target + 1)) - 1)).bit_length() - 1
+    candidates = [best_under]
+    over = reachable >> (target + 1)
+    if over:
+        candidates.append((over & -over).bit_length() + target)
+    totals = np.array(candidates)
+    total = int(totals[np.argmin(fitness_from_totals(totals, target))])
+
+    # Walk the items backwards: item i is needed when `total` was not
+    # reachable without it
+    genome = np.zeros(num_values, dtype=np.uint8)
+    remaining = total
+    for block in range(len(saved) - 1, -1, -1):
+        first = block * stride
+        values = item_values[first : first + stride]
+        history = [saved[block]]
+        for value in values[:-1]:
+            history.append((history[-1] | (history[-1] << int(value))) & sum_mask)
+        for j in range(len(values) - 1, -1, -1):
+            if not (history[j] >> remaining) & 1:
+                genome[first + j] = 1
+                remaining -= int(values[j])
+    return genome, total
+
+
+def subset_sums(values):
+    # Sums of all 2**len(values) subsets; bit k of the index selects values[k]
+    sums = np.zeros(1, dtype=np.int64)
+    for value in values:
+        sums = np.concatenate((sums, sums + value))
+    return sums
+
+
+def solve_exact_mitm(item_values, target):
+    # Meet in the middle: enumerate the subset sums of both halves, sort one
+    # side and binary search it for the partner closest to the target
+    half = len(item_values) // 2
+    first = subset_sums(item_values[:half])
+    second = subset_sums(item_values[half:])
+    order = np.argsort(second)
+    second_sorted = second[order]
+
+    under = np.searchsorted(second_sorted, target - first, side="right") - 1
+    over = np.minimum(under + 1, len(second_sorted) - 1)
+    pairs = np.concatenate(
+        (
+            np.stack((np.arange(len(first)), under), axis=1)[under >= 0],
+            np.stack((np.arange(len(first)), over), axis=1),
+        )
+    )
+    totals = first[pairs[:, 0]] + second_sorted[pairs[:, 1]]
+    best = np.argmin(fitness_from_totals(totals, target))
+    first_mask, second_mask = pairs[best, 0], order[pairs[best, 1]]
+
+    genome = np.zeros(len(item_values), dtype=np.uint8)
+    genome[:half] = (first_mask >> np.arange(half)) & 1
+    genome[half:] = (second_mask >> np.arange(len(item_values) - half)) & 1
+    return genome, int(totals[best])
+
+
+def solve_exact(item_values, target, method=exact_method):
+    # Optimal subset under the same fitness the GA minimizes
+    item_values = np.asarray(item_values, dtype=np.int64)
+    if method == "auto":
+        # Rough operation counts: the DP does n shifts of a (target + max)-bit
+        # integer, meet in the middle sorts and searches 2**(n/2) sums
+        n = len(item_values)
+        method = "dp"
+        if n <= mitm_max_items:
+            # 2 ** (n / 2) overflows a float for large n, so only cost small ones
+            dp_cost = n * (target + int(item_values.max(initial=0))) / 64
+            mitm_cost = 2 ** (n / 2) * max(n / 2, 1)
+            if mitm_cost < dp_cost:
+                method = "mitm"
+    start = time.perf_counter()
+    if method == "dp":
+        genome, total = solve_exact_dp(item_values, target)
+    elif method == "mitm":
+        genome, total = solve_exact_mitm(item_values, target)
+    else:
+        raise ValueError(f"Unknown exact method: {method}")
+    fitness = fitness_from_totals(np.array([total]), target)[0]
+    return KnapsackResult(
+        genome, total, fitness, 0, time.perf_counter() - start, method
+    )
+
+
+class KnapsackSolver:
+    # Headless GA engine. It only needs the item values and the target, so it
+    # can be driven from the UI, scripts or batch jobs without a display.
+    def __init__(
+        self,
+        item_values,
+        target,
+        pop_size=pop_size,
+        elitism_count=elitism_count,
+        mutation_rate=mutation_rate,
+        tournament_size=5,
+        seeded_fraction=seeded_fraction,
+        repair=use_repair,
+        packed=False,
+        fitness_function=None,
+        fitness_cache=None,
+        checkpoint_path=None,
+        checkpoint_interval=checkpoint_interval,
+        progress_callback=None,
+        seed=None,
+        population=None,
+    ):
+        self.item_values = np.asarray(item_values)
+        self.target = target
+        self.num_items = len(self.item_values)
+        self.pop_size = pop_size
+        self.elitism_count = elitism_count
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.repair = repair
+        # Packed mode stores eight genes per byte (np.packbits layout)
+        self.packed = packed
+        # Optional fitness_function(genomes, item_values, target) scoring a
+        # matrix of unpacked 0/1 genomes (lower is better, 0 is optimal).
+        # When a FitnessCache is given it is consulted before scoring.
+        self.fitness_function = fitness_function
+        self.fitness_cache = fitness_cache
+        # Snapshots are taken every checkpoint_interval generations and at the
+        # end of run(), and written to checkpoint_path in the background
+        self.checkpoint_writer = None
+        if checkpoint_path is not None:
+            self.checkpoint_writer = CheckpointWriter(checkpoint_path)
+        self.checkpoint_interval = checkpoint_interval
+        # Called as progress_callback(generation, best_fitness, best_genome)
+        self.progress_callback = progress_callback
+        self.rng = np.random.default_rng(seed)
+
+        # Initialize population. Two buffers are preallocated and swapped every
+        # generation so the offspring are written in place. A given
+        # `population` (storage rows, e.g. from a checkpoint) is used as is.
+        if self.packed:
+            self.row_width = (self.num_items + 7) // 8
+            self._byte_values = packed_byte_values(self.item_values, self.row_width)
+        else:
+            self.row_width = self.num_items
+            self._item_values = self.item_values.astype(np.int64)
+        self._gene_index = np.arange(self.row_width)
+        if population is not None:
+            self.population = population
+        elif self.packed:
+            self.population = self.rng.integers(
+                256, size=(self.pop_size, self.row_width), dtype=np.uint8
+            )
+            # Keep the padding bits of the last byte at zero
+            tail_mask = np.packbits(np.ones(self.num_items, dtype=np.uint8))[-1]
+            self.population[:, -1] &= tail_mask
+        else:
+            self.population = self.rng.integers(
+                2, size=(self.pop_size, self.num_items), dtype=np.uint8
+            )
+        # Replace part of the random population with heuristic seeds
+        num_seeded = int(round(self.pop_size * seeded_fraction))
+        if population is None and num_seeded > 0:
+            self.store(
+                slice(0, num_seeded),
+                heuristic_seeds(self.item_values, self.target, num_seeded, self.rng),
+            )
+        self._next_population = np.empty_like(self.population)
+        self.population_totals = None
+        self._next_totals = np.empty(self.pop_size, dtype=np.int64)
+        self.fitness_scores = None
+        self.best_fitness = float("inf")
+        self.best_genome = None
+        self.generation = 0
+
+    def totals(self, population):
+        if not self.packed:
+            return np.dot(population, self._item_values)
+        # Look up the value of each byte's selected items instead of unpacking
+        # the genomes. Work in row chunks to bound the size of the temporary.
+        totals = np.empty(len(population), dtype=np.int64)
+        chunk = max(1, packed_chunk_bytes // max(self.row_width * 8, 1))
+        for start in range(0, len(population), chunk):
+            rows = population[start : start + chunk]
+            totals[start : start + chunk] = self._byte_values[
+                self._gene_index, rows
+            ].sum(axis=1)
+        return totals
+
+    def store(self, index, genomes):
+        # Write unpacked 0/1 genomes into the population rows at `index`
+        if self.packed:
+            self.population[index, : (self.num_items + 7) // 8] = np.packbits(
+                genomes, axis=1
+            )
+        else:
+            self.population[index, : self.num_items] = genomes
+
+    def genome(self, index):
+        # Unpacked 0/1 genome of one individual
+        if self.packed:
+            return np.unpackbits(self.population[index], count=self.num_items)
+        return self.population[index, : self.num_items].copy()
+
+    def genomes(self, index):
+        # Unpacked 0/1 genomes of several individuals
+        if self.packed:
+            return np.unpackbits(self.population[index], axis=1, count=self.num_items)
+        return self.population[index, : self.num_items].copy()
+
+    def fitness(self, population):
+        return fitness_from_totals(self.totals(population), self.target)
+
+    def select_parents(self, fitness_scores, count):
+        # Run `count` tournaments at once and return the winners' indices
+        participants = self.rng.integers(
+            self.pop_size, size=(count, self.tournament_size)
+        )
+        winners = np.argmin(fitness_scores[participants], axis=1)
+        return participants[np.arange(count), winners]
+
+    def crossover(self, parents1, second, children):
+        # Single-point crossover for every child in one pass: genes before the
+        # crossover point come from the first parent, the rest from the second
+        # (whose genomes are passed in as `second`)
+        count = len(children)
+        crossover_points = self.rng.integers(
+            1, max(self.num_items - 1, 2), size=(count, 1)
+        )
+        if self.packed:
+            # Byte mask that is all ones before the crossover point, with the
+            # byte containing the point partially set
+            full_bytes, partial_bits = np.divmod(crossover_points, 8)
+            mask = np.where(self._gene_index < full_bytes, 0xFF, 0).astype(np.uint8)
+            partial = (0xFF00 >> partial_bits).astype(np.uint8)
+            in_range = full_bytes[:, 0] < self.row_width
+            mask[in_range, full_bytes[in_range, 0]] = partial[in_range, 0]
+            # child = parent2 ^ ((parent1 ^ parent2) & mask)
+            np.bitwise_xor(self.population[parents1], second, out=children)
+            children &= mask
+            children ^= second
+        else:
+            from_first = self._gene_index < crossover_points
+            np.copyto(children, second)
+            np.copyto(children, self.population[parents1], where=from_first)
+
+    def mutate(self, children):
+        # Draw only the flipped positions and XOR their bits in place
+        num_genes = len(children) * self.num_items
+        num_flips = self.rng.binomial(num_genes, self.mutation_rate)
+        flips = self.rng.integers(num_genes, size=num_flips)
+        if self.packed:
+            # Several flips often land in the same byte, so OR their bits
+            # together per (row, byte) first. Sorted flips keep each byte's
+            # bits contiguous. Sorting and dropping repeats is much faster
+            # than np.unique.
+            if len(flips) == 0:
+                return
+            flips.sort()
+            flips = flips[np.r_[True, flips[1:] != flips[:-1]]]
+            rows, cols = np.divmod(flips, self.num_items)
+            bits = (0x80 >> (cols & 7)).astype(np.uint8)
+            keys = rows * children.shape[1] + (cols >> 3)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            masks = np.bitwise_or.reduceat(bits, starts)
+            children[rows[starts], cols[starts] >> 3] ^= masks
+        else:
+            # Repeated positions are flipped once, which only matters for a
+            # tiny fraction of draws and is much cheaper than ufunc.at
+            rows, cols = np.divmod(flips, self.num_items)
+            children[rows, cols] ^= 1  # Flip bits
+
+    def repair_population(self, totals):
+        # Repair every over-target individual, a chunk of rows at a time
+        over = np.flatnonzero(totals > self.target)
+        chunk = max(1, chunk_genes // max(self.num_items, 1))
+        for start in range(0, len(over), chunk):
+            index = over[start : start + chunk]
+            genomes = self.genomes(index)
+            totals[index] = repair_genomes(
+                genomes, totals[index], self.item_values, self.target, self.rng
             )
+            self.store(index, genomes)
+
+    def score(self, rows, totals):
+        if self.fitness_function is None:
+            return fitness_from_totals(totals, self.target)
+        if self.packed:
+            genomes = np.unpackbits(rows, axis=1, count=self.num_items)
+        else:
+            genomes = rows[:, : self.num_items]
+        return np.asarray(
+            self.fitness_function(genomes, self.item_values, self.target),
+            dtype=np.float64,
+        )
+
+    def cached_score(self, totals):
+        # Score only the genomes the cache has not seen
+        rows = self.population if self.packed else np.packbits(self.population, axis=1)
+        keys = [row.tobytes() for row in rows]
+        scores = np.empty(self.pop_size)
+        missing = []
+        for i, key in enumerate(keys):
+            score = self.fitness_cache.get(key)
+            if score is None:
+                missing.append(i)
+            else:
+                scores[i] = score
+        if missing:
+            scores[missing] = self.score(self.population[missing], totals[missing])
+            for i in missing:
+                self.fitness_cache.put(keys[i], scores[i])
+        return scores
+
+    def evaluate(self, totals=None):
+        if totals is None:
+            totals = self.totals(self.population)
+        self.population_totals = totals
+        if self.fitness_cache is None:
+            self.fitness_scores = self.score(self.population, totals)
         else:
-            canvas.create_rectangle(
-                self.x,
-                self.y,
-                self.x + self.w,
-                self.y + self.h,
-                fill="",
-                outline=self.color,
-                width=stroke_width,
+            self.fitness_scores = self.cached_score(totals)
+        min_fitness_idx = np.argmin(self.fitness_scores)
+        min_fitness = self.fitness_scores[min_fitness_idx]
+
+        # Update best solution found
+        if min_fitness < self.best_fitness:
+            self.best_fitness = min_fitness
+            self.best_genome = self.genome(min_fitness_idx)
+
+    def step(self):
+        # Advance one generation and return the best fitness seen so far
+        if self.fitness_scores is None:
+            self.evaluate()
+
+        # Elitism: keep the best genomes
+        new_population = self._next_population
+        new_totals = self._next_totals
+        elites = self.elitism_count
+        if elites > 0:
+            elite_indices = np.argpartition(self.fitness_scores, elites - 1)[:elites]
+            new_population[:elites] = self.population[elite_indices]
+            new_totals[:elites] = self.population_totals[elite_indices]
+
+        # Generate the rest of the new population in one batch
+        children = new_population[elites:]
+        count = len(children)
+        parents = self.select_parents(self.fitness_scores, 2 * count)
+        second = self.population[parents[count:]]
+        self.crossover(parents[:count], second, children)
+        self.mutate(children)
+        new_totals[elites:] = self.totals(children)
+
+        # Swap the population buffers instead of allocating a new array
+        self._next_population = self.population
+        self._next_totals = self.population_totals
+        self.population = new_population
+        self.generation += 1
+        if self.repair:
+            self.repair_population(new_totals)
+        self.evaluate(new_totals)
+        if (
+            self.checkpoint_writer is not None
+            and self.generation % self.checkpoint_interval == 0
+        ):
+            self.checkpoint_writer.submit(self.checkpoint_state())
+        return self.best_fitness
+
+    def checkpoint_state(self):
+        # Everything needed to resume exactly. Arrays are copied here, on the
+        # solver thread; compressing and writing happen elsewhere.
+        if self.fitness_scores is None:
+            self.evaluate()
+        return {
+            "item_values": self.item_values,
+            "target": self.target,
+            "population": self.population.copy(),
+            "population_totals": self.population_totals.copy(),
+            "fitness_scores": self.fitness_scores.copy(),
+            "best_genome": self.best_genome.copy(),
+            "best_fitness": self.best_fitness,
+            "generation": self.generation,
+            "rng_state": json.dumps(self.rng.bit_generator.state),
+            "pop_size": self.pop_size,
+            "elitism_count": self.elitism_count,
+            "mutation_rate": self.mutation_rate,
+            "tournament_size": self.tournament_size,
+            "repair": self.repair,
+            "packed": self.packed,
+        }
+
+    def save_checkpoint(self, path, compress=True):
+        write_checkpoint(path, self.checkpoint_state(), compress)
+
+    @classmethod
+    def from_checkpoint(cls, path, mmap=False, **options):
+        # Rebuild a solver from a checkpoint. With mmap=True the population
+        # of an uncompressed checkpoint is memory-mapped instead of read.
+        # `options` may set arguments that are not saved, such as callbacks.
+        population = mmap_npz_member(path, "population") if mmap else None
+        with np.load(path) as checkpoint:
+            saved = {
+                name: checkpoint[name]
+                for name in checkpoint.files
+                if name != "population" or population is None
+            }
+        for name in (
+            "pop_size",
+            "elitism_count",
+            "tournament_size",
+        ):
+            options.setdefault(name, int(saved[name]))
+        options.setdefault("mutation_rate", float(saved["mutation_rate"]))
+        options.setdefault("repair", bool(saved["repair"]))
+        options.setdefault("packed", bool(saved["packed"]))
+        if population is None:
+            population = saved["population"]
+        solver = cls(
+            saved["item_values"], int(saved["target"]), population=population, **options
+        )
+        solver.population_totals = saved["population_totals"]
+        solver.fitness_scores = saved["fitness_scores"]
+        solver.best_genome = saved["best_genome"]
+        solver.best_fitness = float(saved["best_fitness"])
+        solver.generation = int(saved["generation"])
+        solver.rng.bit_generator.state = json.loads(str(saved["rng_state"]))
+        return solver
+
+    def emigrants(self, count):
+        # Copies of the `count` best individuals (storage rows) and their sums
+        best = np.argpartition(self.fitness_scores, count - 1)[:count]
+        return self.population[best].copy(), self.population_totals[best].copy()
+
+    def immigrate(self, rows, totals):
+        # Replace the worst individuals with genomes from another population
+        worst = np.argpartition(-self.fitness_scores, len(rows) - 1)[: len(rows)]
+        self.population[worst] = rows
+        self.population_totals[worst] = totals
+        self.evaluate(self.population_totals)
+
+    def result(self, elapsed=0.0):
+        return KnapsackResult(
+            self.best_genome,
+            int(np.dot(self.best_genome, self.item_values)),
+            self.best_fitness,
+            self.generation,
+            elapsed,
+        )
+
+    def run(self, max_generations=num_generations, time_limit=None):
+        # Run until the target is hit exactly, max_generations have passed
+        # or time_limit seconds have elapsed, whichever comes first
+        start = time.perf_counter()
+        if self.fitness_scores is None:
+            self.evaluate()
+        for _ in range(max_generations):
+            if self.progress_callback is not None:
+                self.progress_callback(
+                    self.generation, self.best_fitness, self.best_genome
+                )
+            if self.best_fitness == 0:
+                break
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+            self.step()
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.submit(self.checkpoint_state())
+            self.checkpoint_writer.close()
+        return self.result(time.perf_counter() - start)
+
+
+class BatchKnapsackSolver:
+    # Solves many instances of the same size at once. The populations of all
+    # instances are stacked into one (instances, pop_size, num_items) array
+    # and advanced with a single vectorized generation step; instances are
+    # retired as soon as they hit their target. Instances with fewer items
+    # can be padded with zero-valued items.
+    def __init__(
+        self,
+        values_matrix,
+        targets,
+        pop_size=pop_size,
+        elitism_count=elitism_count,
+        mutation_rate=mutation_rate,
+        tournament_size=5,
+        seeded_fraction=seeded_fraction,
+        seed=None,
+    ):
+        self.values = np.asarray(values_matrix, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.num_instances, self.num_items = self.values.shape
+        self.pop_size = pop_size
+        self.elitism_count = elitism_count
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.rng = np.random.default_rng(seed)
+
+        self.population = self.rng.integers(
+            2,
+            size=(self.num_instances, self.pop_size, self.num_items),
+            dtype=np.uint8,
+        )
+        num_seeded = int(round(self.pop_size * seeded_fraction))
+        if num_seeded > 0:
+            for b in range(self.num_instances):
+                self.population[b, :num_seeded] = heuristic_seeds(
+                    self.values[b], int(self.targets[b]), num_seeded, self.rng
+                )
+        self._next_population = np.empty_like(self.population)
+        self._gene_index = np.arange(self.num_items)
+
+        # Rows of the stacked arrays belong to the still active instances
+        self.active = np.arange(self.num_instances)
+        self.best_fitness = np.full(self.num_instances, np.inf)
+        self.best_genomes = np.zeros((self.num_instances, self.num_items), np.uint8)
+        self.generations = np.zeros(self.num_instances, dtype=np.int64)
+        self.fitness_scores = None
+        self.generation = 0
+
+    def evaluate(self):
+        values = self.values[self.active]
+        targets = self.targets[self.active]
+        totals = np.matmul(self.population, values[:, :, None])[:, :, 0]
+        self.fitness_scores = fitness_from_totals(totals, targets[:, None])
+
+        rows = np.arange(len(self.active))
+        best = np.argmin(self.fitness_scores, axis=1)
+        best_fitness = self.fitness_scores[rows, best]
+        improved = best_fitness < self.best_fitness[self.active]
+        self.best_fitness[self.active[improved]] = best_fitness[improved]
+        self.best_genomes[self.active[improved]] = self.population[
+            rows[improved], best[improved]
+        ]
+        self.generations[self.active] = self.generation
+
+    def retire(self):
+        # Drop the instances that hit their target from the stacked arrays
+        keep = self.best_fitness[self.active] != 0
+        if not keep.all():
+            self.active = self.active[keep]
+            self.population = self.population[keep]
+            self._next_population = self._next_population[keep]
+            self.fitness_scores = self.fitness_scores[keep]
+
+    def step(self):
+        # Advance every active instance one generation; returns how many
+        # instances are still active
+        if self.fitness_scores is None:
+            self.evaluate()
+            self.retire()
+        if len(self.active) == 0:
+            return 0
+        num_active = len(self.active)
+        rows = np.arange(num_active)[:, None]
+        new_population = self._next_population
+
+        # Elitism: keep the best genomes of each instance
+        elites = self.elitism_count
+        if elites > 0:
+            elite_indices = np.argpartition(self.fitness_scores, elites - 1, axis=1)
+            new_population[:, :elites] = self.population[
+                rows, elite_indices[:, :elites]
+            ]
+
+        # Tournament selection for all children of all instances at once
+        children = new_population[:, elites:]
+        count = children.shape[1]
+        participants = self.rng.integers(
+            self.pop_size, size=(num_active, 2 * count, self.tournament_size)
+        )
+        scores = self.fitness_scores[rows[:, :, None], participants]
+        winners = np.take_along_axis(
+            participants, np.argmin(scores, axis=2)[:, :, None], axis=2
+        )[:, :, 0]
+
+        # Single-point crossover
+        crossover_points = self.rng.integers(
+            1, max(self.num_items - 1, 2), size=(num_active, count, 1)
+        )
+        from_first = self._gene_index < crossover_points
+        np.copyto(children, self.population[rows, winners[:, count:]])
+        np.copyto(children, self.population[rows, winners[:, :count]], where=from_first)
+
+        # Mutation: draw only the flipped positions
+        num_genes = children.size
+        num_flips = self.rng.binomial(num_genes, self.mutation_rate)
+        flips = self.rng.integers(num_genes, size=num_flips)
+        b, rest = np.divmod(flips, count * self.num_items)
+        c, g = np.divmod(rest, self.num_items)
+        children[b, c, g] ^= 1
+
+        self._next_population = self.population
+        self.population = new_population
+        self.generation += 1
+        self.evaluate()
+        self.retire()
+        return len(self.active)
+
+    def run(self, max_generations=num_generations, time_limit=None):
+        # Returns one KnapsackResult per instance, in input order
+        start = time.perf_counter()
+        for _ in range(max_generations):
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+            if self.step() == 0:
+                break
+        elapsed = time.perf_counter() - start
+        totals = np.sum(self.best_genomes * self.values, axis=1)
+        return [
+            KnapsackResult(
+                self.best_genomes[b],
+                int(totals[b]),
+                self.best_fitness[b],
+                int(self.generations[b]),
+                elapsed,
+                "batch",
+            )
+            for b in range(self.num_instances)
+        ]
+
+
+def island_worker(
+    conn, shm_name, num_values, dtype, target, seed, num_migrants, options
+):
+    # One island: evolves its own population and exchanges migrants with the
+    # coordinator over `conn`. Item values are read from shared memory.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        item_values = np.ndarray(num_values, dtype=dtype, buffer=shm.buf)
+        solver = KnapsackSolver(item_values, target, seed=seed, **options)
+        solver.evaluate()
+        # The initial population counts too, in case no round is ever run
+        conn.send((solver.best_fitness, solver.best_genome, solver.generation, None))
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            generations, time_limit, immigrants = message
+            if immigrants is not None:
+                solver.immigrate(*immigrants)
+            solver.run(generations, time_limit)
+            conn.send(
+                (
+                    solver.best_fitness,
+                    solver.best_genome,
+                    solver.generation,
+                    solver.emigrants(num_migrants),
+                )
             )
+        # Drop every view of the shared buffer before closing it
+        del solver, item_values
+    finally:
+        shm.close()
+
+
+class IslandSolver:
+    # Island-model GA: independent KnapsackSolver populations run in separate
+    # processes and periodically send their best genomes to their neighbours.
+    # Item values are placed in shared memory once instead of being pickled
+    # to every island.
+    def __init__(
+        self,
+        item_values,
+        target,
+        num_islands=island_count,
+        migration_interval=migration_interval,
+        migration_size=migration_size,
+        topology=island_topology,
+        progress_callback=None,
+        seed=None,
+        **solver_options,
+    ):
+        if topology not in ("ring", "full"):
+            raise ValueError(f"Unknown island topology: {topology}")
+        self.item_values = np.ascontiguousarray(item_values, dtype=np.int64)
+        self.target = target
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        # Called as progress_callback(generation, best_fitness, best_genome)
+        self.progress_callback = progress_callback
+        self.seed = seed
+        self.solver_options = solver_options
+        self.best_fitness = float("inf")
+        self.best_genome = None
+        self.generation = 0
+
+    def record_replies(self, replies, base_generation):
+        # Islands stop early on the target or the time limit, so the
+        # generation count is the furthest any of them got
+        self.generation = base_generation + max(reply[2] for reply in replies)
+        for best_fitness, best_genome, _, _ in replies:
+            if best_fitness < self.best_fitness:
+                self.best_fitness = best_fitness
+                self.best_genome = best_genome
+
+    def route_migrants(self, emigrants):
+        # Immigrants for each island according to the topology
+        if self.topology == "ring":
+            return [emigrants[i - 1] for i in range(self.num_islands)]
+        rows = np.concatenate([r for r, _ in emigrants])
+        totals = np.concatenate([t for _, t in emigrants])
+        fitness = fitness_from_totals(totals, self.target)
+        immigrants = []
+        for i in range(self.num_islands):
+            # Best genomes from every island except this one
+            own = slice(i * self.migration_size, (i + 1) * self.migration_size)
+            others = np.ones(len(rows), dtype=bool)
+            others[own] = False
+            order = np.flatnonzero(others)[np.argsort(fitness[others])]
+            chosen = order[: self.migration_size]
+            immigrants.append((rows[chosen], totals[chosen]))
+        return immigrants
+
+    def run(self, max_generations=num_generations, time_limit=None):
+        start = time.perf_counter()
+        shm = shared_memory.SharedMemory(create=True, size=self.item_values.nbytes)
+        # spawn keeps the workers independent of the Tk main loop and threads
+        context = multiprocessing.get_context("spawn")
+        seeds = np.random.SeedSequence(self.seed).spawn(self.num_islands)
+        connections = []
+        workers = []
+        base_generation = self.generation
+        try:
+            np.ndarray(
+                len(self.item_values), dtype=self.item_values.dtype, buffer=shm.buf
+            )[:] = self.item_values
+            for seed in seeds:
+                parent_conn, child_conn = context.Pipe()
+                worker = context.Process(
+                    target=island_worker,
+                    args=(
+                        child_conn,
+                        shm.name,
+                        len(self.item_values),
+                        self.item_values.dtype,
+                        self.target,
+                        seed,
+                        self.migration_size,
+                        self.solver_options,
+                    ),
+                    daemon=True,
+                )
+                worker.start()
+                connections.append(parent_conn)
+                workers.append(worker)
+            self.record_replies([conn.recv() for conn in connections], base_generation)
+
+            immigrants = [None] * self.num_islands
+            while self.generation < max_generations and self.best_fitness != 0:
+                remaining = None
+                if time_limit is not None:
+                    remaining = time_limit - (time.perf_counter() - start)
+                    if remaining <= 0:
+                        break
+                generations = min(
+                    self.migration_interval, max_generations - self.generation
+                )
+                for conn, incoming in zip(connections, immigrants):
+                    conn.send((generations, remaining, incoming))
+                replies = [conn.recv() for conn in connections]
+                self.record_replies(replies, base_generation)
+                immigrants = self.route_migrants([reply[3] for reply in replies])
+                if self.progress_callback is not None:
+                    self.progress_callback(
+                        self.generation, self.best_fitness, self.best_genome
+                    )
+        finally:
+            for conn in connections:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass  # The worker has already exited
+            for worker in workers:
+                worker.join()
+            shm.close()
+            shm.unlink()
+
+        return KnapsackResult(
+            self.best_genome,
+            int(np.dot(self.best_genome, self.item_values)),
+            self.best_fitness,
+            self.generation,
+            time.perf_counter() - start,
+            "islands",
+        )
 
 
 class UI(tk.Tk):
@@ -87,6 +1219,13 @@ class UI(tk.Tk):
 
         self.items_list = []
         self.item_values = None  # Will store item values as a NumPy array
+        self.rng = np.random.default_rng()
+        # Canvas items are created once and then updated in place
+        self.shown_genome = None
+        self.target_ids = None
+        self.sum_ids = None
+        self.solver_thread = None
+        self.mailbox = LatestState()
 
         # Create a label to display the current generation and best fitness
         self.status_label = tk.Label(self, text="", font=("Arial", 16))
@@ -111,9 +1250,7 @@ class UI(tk.Tk):
             if not self.items_list:
                 tk.messagebox.showerror("Error", "Please generate items first.")
                 return
-            target_set = random.sample(self.items_list, int(num_items * frac_target))
-            total = sum(item.value for item in target_set)
-            self.target = total
+            self.target = generate_target(self.item_values, self.rng)
             self.draw_target()
 
         menu_K.add_command(label="Get Target", command=set_target, underline=0)
@@ -124,34 +1261,78 @@ class UI(tk.Tk):
                     "Error", "Please generate items and set target first."
                 )
                 return
-            thread = threading.Thread(target=self.run, args=())
-            thread.start()
+            if self.solver_thread is not None and self.solver_thread.is_alive():
+                return
+            self.start_solver(
+                KnapsackSolver(
+                    self.item_values,
+                    self.target,
+                    repair=self.repair_var.get(),
+                    checkpoint_path=checkpoint_file,
+                    progress_callback=self.publish_progress,
+                )
+            )
 
         menu_K.add_command(label="Run", command=start_thread, underline=0)
 
-        self.mainloop()
+        def resume():
+            if self.solver_thread is not None and self.solver_thread.is_alive():
+                return
+            try:
+                solver = KnapsackSolver.from_checkpoint(
+                    checkpoint_file,
+                    checkpoint_path=checkpoint_file,
+                    progress_callback=self.publish_progress,
+                )
+            except (OSError, KeyError, ValueError) as e:
+                tk.messagebox.showerror("Error", f"Cannot resume: {e}")
+                return
+            self.load_items(solver.item_values)
+            self.target = solver.target
+            self.draw_items()
+            self.draw_target()
+            self.start_solver(solver)
 
-    def get_rand_item(self):
-        while True:
-            i1 = Item()
-            if i1.value not in [item.value for item in self.items_list]:
-                return i1
+        menu_K.add_command(label="Resume", command=resume, underline=1)
 
-    def add_item(self):
-        item = self.get_rand_item()
-        self.items_list.append(item)
+        self.repair_var = tk.BooleanVar(value=use_repair)
+        menu_K.add_checkbutton(label="Repair", variable=self.repair_var, underline=1)
+
+        def solve_exact_mode():
+            if not self.items_list or self.target == 0:
+                tk.messagebox.showerror(
+                    "Error", "Please generate items and set target first."
+                )
+                return
+            try:
+                result = solve_exact(self.item_values, self.target)
+            except ValueError as e:
+                tk.messagebox.showerror("Error", str(e))
+                return
+            self.show_result(result)
+            self.status_label.config(
+                text=f"Exact ({result.method}): Best Fitness: {result.fitness}, "
+                f"Time: {result.elapsed * 1000:.1f} ms"
+            )
+
+        menu_K.add_command(label="Solve Exact", command=solve_exact_mode, underline=0)
+
+        self.mainloop()
 
     def generate_knapsack(self):
-        self.canvas.delete("all")
+        self.load_items(generate_item_values(num_items, self.rng))
+
+    def load_items(self, item_values):
+        self.clear_canvas()
         self.items_list.clear()
         self.target = 0
         self.status_label.config(text="")
-        for _ in range(num_items):
-            self.add_item()
-
-        self.item_values = np.array([item.value for item in self.items_list])
+        self.item_values = np.asarray(item_values)
+        # Item objects are only needed for drawing
+        self.items_list.extend(Item(int(value)) for value in self.item_values)
 
         item_max = self.item_values.max()
+        num_items = len(self.items_list)
 
         w = self.width - screen_padding
         h = self.height - screen_padding
@@ -176,22 +1357,31 @@ class UI(tk.Tk):
 
     def clear_canvas(self):
         self.canvas.delete("all")
+        self.shown_genome = None
+        self.target_ids = None
+        self.sum_ids = None
 
     def draw_items(self):
         for item in self.items_list:
             item.draw(self.canvas)
+        self.shown_genome = np.zeros(len(self.items_list), dtype=np.uint8)
 
     def draw_target(self):
+        if self.target_ids is not None:
+            self.canvas.itemconfig(self.target_ids[1], text=f"Target: {self.target}")
+            return
         x = (self.width - screen_padding) / 8 * 7
         y = screen_padding
         w = (self.width - screen_padding) / 8 - screen_padding
         h = self.height / 2 - screen_padding
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill="black")
-        self.canvas.create_text(
-            x + w // 2,
-            y + h + screen_padding,
-            text=f"Target: {self.target}",
-            font=("Arial", 18),
+        self.target_ids = (
+            self.canvas.create_rectangle(x, y, x + w, y + h, fill="black"),
+            self.canvas.create_text(
+                x + w // 2,
+                y + h + screen_padding,
+                text=f"Target: {self.target}",
+                font=("Arial", 18),
+            ),
         )
 
     def draw_sum(self, item_sum):
@@ -200,118 +1390,71 @@ class UI(tk.Tk):
         w = (self.width - screen_padding) / 8 - screen_padding
         h = self.height / 2 - screen_padding
         h *= min(item_sum / self.target, 1)  # Cap the height at the target
-        self.canvas.create_rectangle(x, y, x + w, y + h, fill="black")
         diff = item_sum - self.target
         sign = "+" if diff > 0 else "-"
-        self.canvas.create_text(
-            x + w // 2,
-            y + h + screen_padding,
-            text=f"Sum: {item_sum} ({sign}{abs(diff)})",
-            font=("Arial", 18),
-        )
+        text = f"Sum: {item_sum} ({sign}{abs(diff)})"
+        if self.sum_ids is None:
+            self.sum_ids = (
+                self.canvas.create_rectangle(x, y, x + w, y + h, fill="black"),
+                self.canvas.create_text(
+                    x + w // 2, y + h + screen_padding, text=text, font=("Arial", 18)
+                ),
+            )
+        else:
+            rect_id, text_id = self.sum_ids
+            self.canvas.coords(rect_id, x, y, x + w, y + h)
+            self.canvas.coords(text_id, x + w // 2, y + h + screen_padding)
+            self.canvas.itemconfig(text_id, text=text)
 
     def draw_genome(self, genome):
-        for i in range(num_items):
-            item = self.items_list[i]
-            active = genome[i]
-            item.draw(self.canvas, active)
-        # Draw items again to ensure proper layering
-        # self.draw_items()
-
-    def run(self):
-        def fitness(population):
-            total_values = np.dot(population, self.item_values)
-            fitness_scores = np.empty(pop_size)
-            over_target = total_values > self.target
-            # Apply severe penalty for exceeding the target
-            fitness_scores[over_target] = (
-                total_values[over_target] - self.target
-            ) + 1000
-            # Fitness is the difference to target for under-target solutions
-            fitness_scores[~over_target] = self.target - total_values[~over_target]
-            return fitness_scores
-
-        def select_parents(population, fitness_scores, tournament_size=5):
-            parents = []
-            for _ in range(2):
-                participants_idx = np.random.choice(
-                    pop_size, tournament_size, replace=False
-                )
-                participants = population[participants_idx]
-                participants_fitness = fitness_scores[participants_idx]
-                winner_idx = np.argmin(participants_fitness)
-                winner = participants[winner_idx]
-                parents.append(winner)
-            return parents[0], parents[1]
-
-        def crossover(parent1, parent2):
-            crossover_point = np.random.randint(1, num_items - 1)
-            child = np.concatenate(
-                (parent1[:crossover_point], parent2[crossover_point:])
-            )
-            return child
-
-        def mutate(genome):
-            mutation_indices = np.random.rand(num_items) < mutation_rate
-            genome[mutation_indices] = 1 - genome[mutation_indices]  # Flip bits
-            return genome
-
-        # Initialize population
-        population = np.random.randint(2, size=(pop_size, num_items))
-        best_fitness = float("inf")
-        best_genome = None
-
-        for generation in range(num_generations):
-            fitness_scores = fitness(population)
-            min_fitness_idx = np.argmin(fitness_scores)
-            min_fitness = fitness_scores[min_fitness_idx]
-            best_genome_gen = population[min_fitness_idx]
-
-            # Update best solution found
-            if min_fitness < best_fitness:
-                best_fitness = min_fitness
-                best_genome = best_genome_gen.copy()
-
-            # Update UI
-            self.after(0, self.clear_canvas)
-            self.after(0, self.draw_target)
-            self.after(0, self.draw_sum, np.dot(best_genome, self.item_values))
-            self.after(0, self.draw_genome, best_genome)
+        # Only touch the items whose state differs from what is on screen
+        if self.shown_genome is None:
+            self.draw_items()
+        for i in np.flatnonzero(genome != self.shown_genome):
+            self.items_list[i].set_active(self.canvas, bool(genome[i]))
+        self.shown_genome = genome.copy()
+
+    def show_result(self, result):
+        self.draw_target()
+        self.draw_sum(result.total)
+        self.draw_genome(result.genome)
+
+    def render_frame(self):
+        # Runs on the Tk main loop at frame_rate until the solver thread ends.
+        # Checking the thread before taking the state guarantees its last
+        # published state is drawn.
+        running = self.solver_thread.is_alive()
+        state = self.mailbox.take()
+        if state is not None:
+            label, generation, best_fitness, best_genome = state
+            self.draw_sum(np.dot(best_genome, self.item_values))
+            self.draw_genome(best_genome)
             self.status_label.config(
-                text=f"Generation: {generation}, Best Fitness: {best_fitness}"
+                text=f"{label}: {generation}, Best Fitness: {best_fitness}"
             )
-            self.update_idletasks()
+        if running:
+            self.after(int(1000 / frame_rate), self.render_frame)
 
-            if best_fitness == 0:
-                print("Optimal solution found!")
-                break
+    def start_solver(self, solver):
+        if self.solver_thread is not None and self.solver_thread.is_alive():
+            return
+        self.solver_thread = threading.Thread(
+            target=self.run, args=(solver,), daemon=True
+        )
+        self.solver_thread.start()
+        self.render_frame()
+
+    def publish_progress(self, generation, best_fitness, best_genome):
+        self.mailbox.publish(("Generation", generation, best_fitness, best_genome))
 
-            # Elitism: keep the best genomes
-            sorted_indices = np.argsort(fitness_scores)
-            elites = population[sorted_indices[:elitism_count]]
-
-            # Generate new population
-            new_population = elites.copy()
-            while len(new_population) < pop_size:
-                parent1, parent2 = select_parents(population, fitness_scores)
-                child = crossover(parent1, parent2)
-                child = mutate(child)
-                new_population = np.vstack([new_population, child])
-
-            population = new_population[:pop_size]  # Ensure population size
-
-            # Sleep to control iteration speed
-            threading.Event().wait(sleep_time)
-
-        # Final update
-        self.after(0, self.clear_canvas)
-        self.after(0, self.draw_target)
-        self.after(0, self.draw_sum, np.dot(best_genome, self.item_values))
-        self.after(0, self.draw_genome, best_genome)
-        self.status_label.config(
-            text=f"Final Generation: {generation}, Best Fitness: {best_fitness}"
+    def run(self, solver):
+        # A resumed solver only runs the generations it has left
+        result = solver.run(max(num_generations - solver.generation, 0))
+        if result.fitness == 0:
+            print("Optimal solution found!")
+        self.mailbox.publish(
+            ("Final Generation", result.generations, result.fitness, result.genome)
         )
-        self.update_idletasks()
 
 
 if __name__ == "__main__":
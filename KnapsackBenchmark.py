@@ -0,0 +1,209 @@
+import argparse
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+import Knapsack
+
+sizes = [100, 1000, 10000, 100000]
+frac_targets = [0.3, 0.7]
+seeds = [0, 1, 2]
+time_limit = 10.0  # Seconds allowed per run
+max_generations = 2000
+
+fields = [
+    "solver",
+    "options",
+    "num_items",
+    "frac_target",
+    "seed",
+    "generations",
+    "elapsed",
+    "generations_per_sec",
+    "time_to_target",
+    "final_gap",
+    "peak_memory",
+]
+
+
+def parse_option(text):
+    # "name=value" with the value read as a Python literal where possible
+    name, _, value = text.partition("=")
+    try:
+        value = json.loads(value.lower() if value in ("True", "False") else value)
+    except ValueError:
+        pass
+    return name, value
+
+
+def run_once(solver_name, options, item_values, target, seed, generations, limit):
+    # Every time is measured from one start point before the solver is built,
+    # so set-up such as heuristic seeding counts towards all of them
+    start = time.perf_counter()
+    hit_target = []
+
+    def record(generation, best_fitness, best_genome):
+        if best_fitness == 0 and not hit_target:
+            hit_target.append(time.perf_counter() - start)
+
+    if solver_name == "exact":
+        result = Knapsack.solve_exact(item_values, target, **options)
+    elif solver_name == "islands":
+        solver = Knapsack.IslandSolver(
+            item_values, target, progress_callback=record, seed=seed, **options
+        )
+        result = solver.run(generations, limit)
+    else:
+        solver = Knapsack.KnapsackSolver(
+            item_values, target, progress_callback=record, seed=seed, **options
+        )
+        result = solver.run(generations, limit)
+
+    elapsed = time.perf_counter() - start
+    if result.fitness == 0 and not hit_target:
+        hit_target.append(elapsed)
+    return result, elapsed, hit_target[0] if hit_target else None
+
+
+def benchmark(
+    solver_name,
+    options,
+    sizes=sizes,
+    frac_targets=frac_targets,
+    seeds=seeds,
+    generations=max_generations,
+    limit=time_limit,
+    measure_memory=True,
+):
+    # Yields one row per (size, frac_target, seed). Instances are generated
+    # from the seed, so runs are comparable between solvers and versions.
+    # tracemalloc slows allocation down, so peak memory comes from a second,
+    # untimed run of the same number of generations. It only sees this
+    # process, so it is left empty for the island solver.
+    for num_items in sizes:
+        high = max(Knapsack.max_value, Knapsack.min_value + 16 * num_items)
+        for frac in frac_targets:
+            for seed in seeds:
+                item_values, target = next(
+                    Knapsack.generate_instances(
+                        1, num_items, seed=seed, high=high, frac=frac
+                    )
+                )
+                try:
+                    result, elapsed, time_to_target = run_once(
+                        solver_name,
+                        options,
+                        item_values,
+                        target,
+                        seed,
+                        generations,
+                        limit,
+                    )
+                except ValueError as e:
+                    # e.g. an instance too large for the exact solver
+                    print(
+                        f"n={num_items} frac={frac:.2f} seed={seed}: {e}",
+                        file=sys.stderr,
+                    )
+                    continue
+                peak_memory = None
+                if measure_memory and solver_name != "islands":
+                    tracemalloc.start()
+                    try:
+                        run_once(
+                            solver_name,
+                            options,
+                            item_values,
+                            target,
+                            seed,
+                            result.generations,
+                            None,
+                        )
+                        peak_memory = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                yield {
+                    "solver": solver_name,
+                    "options": json.dumps(options, sort_keys=True),
+                    "num_items": num_items,
+                    "frac_target": frac,
+                    "seed": seed,
+                    "generations": result.generations,
+                    "elapsed": elapsed,
+                    "generations_per_sec": (
+                        result.generations / elapsed if elapsed > 0 else 0.0
+                    ),
+                    "time_to_target": time_to_target,
+                    "final_gap": float(result.fitness),
+                    "peak_memory": peak_memory,
+                }
+
+
+def write_rows(rows, path):
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+    else:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Knapsack solvers.")
+    parser.add_argument("--solver", choices=["ga", "islands", "exact"], default="ga")
+    parser.add_argument(
+        "--option",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="solver keyword argument, e.g. packed=true or tournament_size=3",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=sizes)
+    parser.add_argument("--frac-targets", type=float, nargs="+", default=frac_targets)
+    parser.add_argument("--seeds", type=int, nargs="+", default=seeds)
+    parser.add_argument("--time-limit", type=float, default=time_limit)
+    parser.add_argument("--generations", type=int, default=max_generations)
+    parser.add_argument("--output", help="write results to a .csv or .json file")
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip the extra run that measures peak memory",
+    )
+    args = parser.parse_args(argv)
+
+    options = dict(parse_option(text) for text in args.option)
+
+    rows = []
+    for row in benchmark(
+        args.solver,
+        options,
+        args.sizes,
+        args.frac_targets,
+        args.seeds,
+        args.generations,
+        args.time_limit,
+        not args.no_memory,
+    ):
+        rows.append(row)
+        time_to_target = row["time_to_target"]
+        peak_memory = row["peak_memory"]
+        print(
+            f"n={row['num_items']:>7} frac={row['frac_target']:.2f} "
+            f"seed={row['seed']} gens={row['generations']:>5} "
+            f"gens/s={row['generations_per_sec']:>9.1f} "
+            f"to_target="
+            + (f"{time_to_target:.3f}s" if time_to_target is not None else "-")
+            + f" gap={row['final_gap']:.0f} peak="
+            + (f"{peak_memory / 2**20:.1f}MiB" if peak_memory is not None else "-"),
+            file=sys.stderr,
+        )
+    if args.output:
+        write_rows(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import json
+import multiprocessing
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import Knapsack
+
+host = "127.0.0.1"
+port = 8631
+num_workers = 4  # Solver processes
+batch_size = 64  # Most instances handed to a worker at once
+batch_wait = 0.01  # Seconds to wait for more requests before dispatching
+default_time_limit = 5.0  # Seconds per request unless the request says otherwise
+max_time_limit = 60.0
+default_generations = Knapsack.num_generations
+max_int64 = int(np.iinfo(np.int64).max)  # Solvers keep values and totals in int64
+
+
+def solve_batch(values_matrix, targets, max_generations, time_limit):
+    # Runs in a worker process. Instances of the same size are solved
+    # together by the batched solver.
+    if len(targets) == 1:
+        solver = Knapsack.KnapsackSolver(values_matrix[0], targets[0])
+        results = [solver.run(max_generations, time_limit)]
+    else:
+        solver = Knapsack.BatchKnapsackSolver(values_matrix, targets)
+        results = solver.run(max_generations, time_limit)
+    return [
+        {
+            "subset": np.flatnonzero(result.genome).tolist(),
+            "total": result.total,
+            "fitness": float(result.fitness),
+            "generations": result.generations,
+            "solve_time": result.elapsed,
+        }
+        for result in results
+    ]
+
+
+class Job:
+    def __init__(self, values, target, time_limit, max_generations):
+        self.values = values
+        self.target = target
+        self.time_limit = time_limit
+        self.max_generations = max_generations
+        self.received = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def key(self):
+        # Jobs are only batched with jobs they can share a solver run with
+        return len(self.values), self.time_limit, self.max_generations
+
+
+class BatchDispatcher:
+    # Collects incoming jobs from a queue, groups them into batches and
+    # hands the batches to a process pool
+    def __init__(self, workers=num_workers, size=batch_size, wait=batch_wait):
+        self.jobs = queue.Queue()
+        self.size = size
+        self.wait = wait
+        # spawn keeps the workers independent of the server's threads
+        self.pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.stats = {"requests": 0, "batches": 0, "instances": 0}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.dispatch_loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, job):
+        with self.lock:
+            self.stats["requests"] += 1
+        self.jobs.put(job)
+
+    def collect(self):
+        # Block for the first job, then gather more until the batch is full
+        # or batch_wait has passed
+        pending = [self.jobs.get()]
+        deadline = time.perf_counter() + self.wait
+        while len(pending) < self.size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self.jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def dispatch_loop(self):
+        while True:
+            groups = {}
+            for job in self.collect():
+                groups.setdefault(job.key(), []).append(job)
+            for (_, time_limit, max_generations), batch in groups.items():
+                # A bad batch fails its own jobs instead of the dispatcher
+                try:
+                    values_matrix = np.array(
+                        [job.values for job in batch], dtype=np.int64
+                    )
+                    targets = np.array([job.target for job in batch], dtype=np.int64)
+                    future = self.pool.submit(
+                        solve_batch, values_matrix, targets, max_generations, time_limit
+                    )
+                except Exception as e:
+                    self.fail(batch, e)
+                    continue
+                future.add_done_callback(
+                    lambda future, batch=batch: self.finish(batch, future)
+                )
+                with self.lock:
+                    self.stats["batches"] += 1
+                    self.stats["instances"] += len(batch)
+
+    def finish(self, batch, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            self.fail(batch, e)
+            return
+        for job, result in zip(batch, results):
+            job.result = result
+            job.done.set()
+
+    def fail(self, batch, error):
+        for job in batch:
+            job.error = str(error)
+            job.done.set()
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def parse_job(body):
+    # Validate a request body and turn it into a Job
+    request = json.loads(body)
+    values = request["values"]
+    target = request["target"]
+    # bool is a subclass of int but not a value
+    if not values or not all(
+        isinstance(v, int) and not isinstance(v, bool) and v >= 0 for v in values
+    ):
+        raise ValueError("values must be a non-empty list of non-negative integers")
+    if sum(values) > max_int64:
+        raise ValueError(f"values must not sum to more than {max_int64}")
+    if not isinstance(target, int) or isinstance(target, bool) or target <= 0:
+        raise ValueError("target must be a positive integer")
+    if target > max_int64:
+        raise ValueError(f"target must not exceed {max_int64}")
+    time_limit = float(request.get("time_limit", default_time_limit))
+    if not 0 < time_limit <= max_time_limit:
+        raise ValueError(f"time_limit must be in (0, {max_time_limit}]")
+    max_generations = int(request.get("max_generations", default_generations))
+    if max_generations <= 0:
+        raise ValueError("max_generations must be positive")
+    return Job(values, target, time_limit, max_generations)
+
+
+class SolveHandler(BaseHTTPRequestHandler):
+    # POST /solve with {"values": [...], "target": n, "time_limit": s,
+    # "max_generations": g}; GET /stats for dispatcher counters
+    dispatcher = None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_json(404, {"error": "not found"})
+            return
+        with self.dispatcher.lock:
+            stats = dict(self.dispatcher.stats)
+        self.send_json(200, stats)
+
+    def do_POST(self):
+        if self.path != "/solve":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = parse_job(self.rfile.read(length))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        self.dispatcher.submit(job)
+        # Allow for queueing and process start-up on top of the solve itself
+        if not job.done.wait(job.time_limit + max_time_limit):
+            self.send_json(504, {"error": "timed out"})
+        elif job.error is not None:
+            self.send_json(500, {"error": job.error})
+        else:
+            result = dict(job.result, latency=time.perf_counter() - job.received)
+            self.send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+
+def serve(host=host, port=port, workers=num_workers):
+    dispatcher = BatchDispatcher(workers)
+    SolveHandler.dispatcher = dispatcher
+    server = ThreadingHTTPServer((host, port), SolveHandler)
+    print(f"Serving Knapsack solver on http://{host}:{port}/solve")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        dispatcher.shutdown()
+
+
+def load_test(url, num_requests, concurrency, size, time_limit, seed=0):
+    # Fire num_requests random instances from `concurrency` client threads
+    # and report throughput and latency percentiles
+    instances = list(Knapsack.generate_instances(num_requests, size, seed=seed))
+    order = queue.Queue()
+    for i in range(num_requests):
+        order.put(i)
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            try:
+                i = order.get_nowait()
+            except queue.Empty:
+                return
+            values, target = instances[i]
+            body = json.dumps(
+                {"values": values.tolist(), "target": target, "time_limit": time_limit}
+            ).encode()
+            request = urllib.request.Request(
+                url, body, {"Content-Type": "application/json"}
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    json.loads(response.read())
+            except (urllib.error.URLError, OSError) as e:
+                with lock:
+                    failures.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(latencies)} ok, {len(failures)} failed in {elapsed:.2f}s")
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"throughput: {len(latencies) / elapsed:.1f} req/s")
+        print(f"latency p50: {p50 * 1000:.1f} ms, p99: {p99 * 1000:.1f} ms")
+    return latencies, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Knapsack solve server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the server")
+    serve_parser.add_argument("--host", default=host)
+    serve_parser.add_argument("--port", type=int, default=port)
+    serve_parser.add_argument("--workers", type=int, default=num_workers)
+    test_parser = commands.add_parser("loadtest", help="load-test a running server")
+    test_parser.add_argument("--url", default=f"http://{host}:{port}/solve")
+    test_parser.add_argument("--requests", type=int, default=200)
+    test_parser.add_argument("--concurrency", type=int, default=16)
+    test_parser.add_argument("--size", type=int, default=Knapsack.num_items)
+    test_parser.add_argument("--time-limit", type=float, default=default_time_limit)
+    test_parser.add_argument("--seed", type=int, default=random.randrange(1 << 16))
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers)
+    else:
+        load_test(
+            args.url,
+            args.requests,
+            args.concurrency,
+            args.size,
+            args.time_limit,
+            args.seed,
+        )
+
+
+if __name__ == "__main__":
+    main()
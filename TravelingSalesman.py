@@ -1,11 +1,29 @@
-import math
+import multiprocessing
+import os
 import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import hypot
+import numpy as np
 import tkinter as tk
 from tkinter import *
 
 num_cities = 50
 city_scale = 5
 padding = 100
+max_edge_cities = 200  # Background edges are only drawn up to this many cities
+dense_matrix_limit = 2000  # Larger instances compute distances from coordinates
+frame_rate = 30  # UI redraws per second while a solver is running
+max_highlighted_edges = 100  # Edges new since the last redraw drawn in orange
+
+# Parameters for local search
+local_search_methods = ("2-opt", "Or-opt", "Or-3opt")  # Each adds moves to the last
+num_neighbors = 10  # Candidate neighbors considered for each city
+search_time_slice = 0.05  # Seconds of local search between redraws
+max_segment = 3  # Longest segment moved by Or-opt
+max_depth = 5  # Most 2-opt steps chained by one Or-3opt move
 
 # Parameters for ACO
 alpha = 1.0  # Influence of pheromone
@@ -16,12 +34,21 @@ max_iterations = 100  # Maximum number of iterations for ACO
 stagnation_limit = (
     20  # Number of iterations with no improvement to consider convergence
 )
+ant_candidates = 20  # Nearest cities each ant chooses between
+pbest = 0.05  # MAX-MIN bounds: chance of rebuilding the best tour at convergence
+ant_workers = os.cpu_count() or 1  # Processes building ants, 1 to build in-process
+ant_pool_min_cities = 1000  # Smaller instances always build ants in-process
+min_ants_per_task = 5  # Fewest ants worth sending to one worker process
 
 # Parameters for GA
 population_size = 100
 mutation_rate = 0.02
 crossover_rate = 0.8
 ga_iterations = 5000
+crossover_method = "OX"  # "OX" (order) or "PMX" (partially mapped)
+selection_method = "roulette"  # "roulette" or "tournament"
+tournament_size = 5
+elitism_count = 2  # Best tours copied unchanged into the next generation
 
 
 class Node:
@@ -42,10 +69,10 @@ class Node:
 
 
 class Edge:
-    def __init__(self, a, b):
+    def __init__(self, a, b, length):
         self.city_a = a
         self.city_b = b
-        self.length = math.hypot(a.x - b.x, a.y - b.y)
+        self.length = length  # Read from the instance's distance matrix
 
     def draw(self, canvas, color="black", dash=(2, 4)):
         canvas.create_line(
@@ -60,6 +87,601 @@ class Edge:
         )
 
 
+def distance_matrix(coords):
+    # Euclidean distance between every pair of cities, computed once per
+    # instance. coords is an (N, 2) array.
+    coords = np.asarray(coords, dtype=np.float64)
+    diff = coords[:, np.newaxis, :] - coords[np.newaxis, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def tour_length(dist, tours):
+    # Length of a closed tour, or of every row of a 2D array of tours
+    tours = np.asarray(tours)
+    return dist[tours, np.roll(tours, -1, axis=-1)].sum(axis=-1)
+
+
+def coords_tour_length(coords, tours):
+    # Same as tour_length, for instances too large for a distance matrix
+    tours = np.asarray(tours)
+    diff = coords[tours] - coords[np.roll(tours, -1, axis=-1)]
+    return np.hypot(diff[..., 0], diff[..., 1]).sum(axis=-1)
+
+
+def measure_tours(coords, dist, tours):
+    # Tour lengths from the distance matrix when the instance has one
+    if dist is None:
+        return coords_tour_length(coords, tours)
+    return tour_length(dist, tours)
+
+
+def nearest_neighbors(coords, k, block=256):
+    # The k nearest other cities of every city, closest first. Rows are
+    # processed in blocks so memory stays O(block * N).
+    coords = np.asarray(coords, dtype=np.float64)
+    N = len(coords)
+    k = min(k, N - 1)
+    neighbors = np.empty((N, k), dtype=np.intp)
+    if k == 0:
+        return neighbors
+    for start in range(0, N, block):
+        rows = coords[start : start + block]
+        d2 = (rows[:, 0, np.newaxis] - coords[:, 0]) ** 2
+        d2 += (rows[:, 1, np.newaxis] - coords[:, 1]) ** 2
+        d2[np.arange(len(rows)), np.arange(start, start + len(rows))] = np.inf
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(d2, nearest, axis=1), axis=1)
+        neighbors[start : start + len(rows)] = np.take_along_axis(
+            nearest, order, axis=1
+        )
+    return neighbors
+
+
+def nearest_neighbor_tour(coords, neighbors, start=0):
+    # Greedy construction: always move to the closest unvisited city. The
+    # candidate lists are tried first and a full scan is only needed once
+    # all of a city's neighbors have been visited.
+    N = len(coords)
+    visited = np.zeros(N, dtype=bool)
+    visited[start] = True
+    tour = [start]
+    candidates = neighbors.tolist()
+    current = start
+    for _ in range(N - 1):
+        for city in candidates[current]:
+            if not visited[city]:
+                break
+        else:
+            unvisited = np.flatnonzero(~visited)
+            diff = coords[unvisited] - coords[current]
+            city = int(unvisited[np.argmin(np.hypot(diff[:, 0], diff[:, 1]))])
+        visited[city] = True
+        tour.append(city)
+        current = city
+    return tour
+
+
+def construct_tours(coords, neighbors, choice, rng, count):
+    # Builds `count` ant tours at once. At each step every ant picks its next
+    # city by roulette over its current city's candidate list, weighted by
+    # the matching row of the choice matrix (tau^alpha * eta^beta) with
+    # visited cities masked out. An ant whose candidates are all visited
+    # falls back to the nearest unvisited city.
+    N, k = neighbors.shape
+    ants = np.arange(count)
+    tours = np.empty((count, N), dtype=np.intp)
+    unvisited = np.ones((count, N), dtype=bool)
+    current = rng.integers(N, size=count)
+    tours[:, 0] = current
+    unvisited[ants, current] = False
+    draws = rng.random((N, count))
+    for step in range(1, N):
+        candidates = neighbors[current]
+        weights = choice[current] * unvisited[ants[:, np.newaxis], candidates]
+        cumulative = np.cumsum(weights, axis=1)
+        thresholds = draws[step] * cumulative[:, -1]
+        # Index of the first cumulative weight above the threshold
+        picks = np.minimum((cumulative <= thresholds[:, np.newaxis]).sum(axis=1), k - 1)
+        cities = candidates[ants, picks]
+        for ant in np.flatnonzero(~unvisited[ants, cities]):
+            left = np.flatnonzero(unvisited[ant])
+            diff = coords[left] - coords[current[ant]]
+            cities[ant] = left[np.argmin(np.hypot(diff[:, 0], diff[:, 1]))]
+        unvisited[ants, cities] = False
+        tours[:, step] = current = cities
+    return tours
+
+
+_ant_worker = {}  # Instance data sent once to each ant worker process
+
+
+def init_ant_worker(coords, neighbors):
+    _ant_worker["coords"] = coords
+    _ant_worker["neighbors"] = neighbors
+
+
+def construct_tours_worker(choice, seed, count):
+    # Each task gets its own child SeedSequence, so streams never overlap
+    rng = np.random.default_rng(seed)
+    return construct_tours(
+        _ant_worker["coords"], _ant_worker["neighbors"], choice, rng, count
+    )
+
+
+def slice_masks(parents1, starts, ends):
+    # For each row: which positions lie in [start, end], and which cities
+    # parents1 has at those positions
+    positions = np.arange(parents1.shape[1])
+    in_slice = (positions >= starts[:, np.newaxis]) & (positions <= ends[:, np.newaxis])
+    city_in_slice = np.empty_like(in_slice)
+    np.put_along_axis(city_in_slice, parents1, in_slice, axis=1)
+    return in_slice, city_in_slice
+
+
+def order_crossover(parents1, parents2, starts, ends):
+    # OX for every row at once: the child keeps parents1's slice in place
+    # and fills the other positions, left to right, with the remaining
+    # cities in parents2's order. City lookups make each child O(N).
+    in_slice, city_in_slice = slice_masks(parents1, starts, ends)
+    keep = ~np.take_along_axis(city_in_slice, parents2, axis=1)
+    children = np.where(in_slice, parents1, 0)
+    # Both masks select N - slice length entries per row, in row order
+    children[~in_slice] = parents2[keep]
+    return children
+
+
+def pmx_crossover(parents1, parents2, starts, ends):
+    # PMX for every row at once: the child is parents2 with parents1's
+    # slice copied in. Cities duplicated outside the slice are replaced by
+    # following the slice's mapping, using a position lookup into parents1.
+    in_slice, city_in_slice = slice_masks(parents1, starts, ends)
+    rows = np.arange(len(parents1))[:, np.newaxis]
+    position1 = np.empty_like(parents1)
+    position1[rows, parents1] = np.arange(parents1.shape[1])
+    children = np.where(in_slice, parents1, parents2)
+    conflicts = ~in_slice & np.take_along_axis(city_in_slice, children, axis=1)
+    r, c = np.nonzero(conflicts)
+    while len(r):
+        children[r, c] = parents2[r, position1[r, children[r, c]]]
+        # Keep following the mapping only where the city is still taken
+        still = city_in_slice[r, children[r, c]]
+        r, c = r[still], c[still]
+    return children
+
+
+class LocalSearch:
+    # Improves a tour in place with moves restricted to each city's nearest
+    # neighbors. Cities are only re-examined after a move touches them
+    # (don't-look bits), and each move reverses the shorter side of the tour
+    # in place. "Or-opt" adds segment relocation to 2-opt, and "Or-3opt"
+    # adds a variable-depth (Lin-Kernighan style) chain of 2-opt steps.
+    def __init__(self, coords, tour, neighbors, method="2-opt"):
+        if method not in local_search_methods:
+            raise ValueError(f"unknown local search method {method!r}")
+        self.method = method
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.tour = list(tour)
+        self.pos = [0] * len(self.tour)  # Position of each city in the tour
+        for i, city in enumerate(self.tour):
+            self.pos[city] = i
+        self.neighbors = neighbors.tolist()
+        self.queue = deque(self.tour)  # Cities whose don't-look bit is off
+        self.queued = [True] * len(self.tour)
+        self.length = float(coords_tour_length(coords, self.tour))
+        self.moves = 0
+        self.iteration = 0
+
+    def push(self, *cities):
+        for city in cities:
+            if not self.queued[city]:
+                self.queued[city] = True
+                self.queue.append(city)
+
+    def reverse(self, i, j):
+        # Reverse the cities at positions i..j, wrapping around the end
+        tour, pos = self.tour, self.pos
+        N = len(tour)
+        length = (j - i) % N + 1
+        if 2 * length > N:
+            # Reversing the rest of the tour gives the same cycle
+            i, j = (j + 1) % N, (i - 1) % N
+            length = N - length
+        if length < 2:
+            return
+        if i <= j:
+            segment = tour[i : j + 1]
+            segment.reverse()
+            tour[i : j + 1] = segment
+            for p, city in enumerate(segment, i):
+                pos[city] = p
+        else:
+            segment = tour[i:] + tour[: j + 1]
+            segment.reverse()
+            split = N - i
+            tour[i:] = segment[:split]
+            tour[: j + 1] = segment[split:]
+            for p, city in enumerate(segment[:split], i):
+                pos[city] = p
+            for p, city in enumerate(segment[split:]):
+                pos[city] = p
+
+    def exchange(self, a, b, c, d):
+        # Replace edges (a, b) and (c, d) with (a, c) and (b, d). b must
+        # follow a in the same direction as d follows c.
+        pos, N = self.pos, len(self.tour)
+        if self.tour[(pos[a] + 1) % N] == b:
+            self.reverse(pos[b], pos[c])
+        else:
+            self.reverse(pos[a], pos[d])
+
+    def two_opt(self, a):
+        # Replace the edge (a, b) leaving a in either direction and the
+        # matching edge (c, d) at one of a's neighbors c with (a, c), (b, d)
+        tour, pos, xs, ys = self.tour, self.pos, self.xs, self.ys
+        N = len(tour)
+        xa, ya = xs[a], ys[a]
+        for step in (1, -1):
+            b = tour[(pos[a] + step) % N]
+            d_ab = hypot(xa - xs[b], ya - ys[b])
+            for c in self.neighbors[a]:
+                d_ac = hypot(xa - xs[c], ya - ys[c])
+                if d_ac >= d_ab:
+                    break  # Neighbors are sorted, so no later c can gain
+                d = tour[(pos[c] + step) % N]
+                if d == a:
+                    continue
+                delta = (
+                    d_ac
+                    + hypot(xs[b] - xs[d], ys[b] - ys[d])
+                    - d_ab
+                    - hypot(xs[c] - xs[d], ys[c] - ys[d])
+                )
+                if delta < -1e-9:
+                    self.exchange(a, b, c, d)
+                    self.length += delta
+                    self.moves += 1
+                    self.push(a, b, c, d)
+                    return True
+        return False
+
+    def or_opt(self, a):
+        # Move the segment of up to max_segment cities starting at a next to
+        # one of a's neighbors, in whichever orientation is shorter
+        tour, pos, xs, ys = self.tour, self.pos, self.xs, self.ys
+        N = len(tour)
+        for step in (1, -1):
+            p = tour[(pos[a] - step) % N]
+            for length in range(1, min(max_segment, N - 3) + 1):
+                segment = [tour[(pos[a] + k * step) % N] for k in range(length)]
+                e = segment[-1]
+                n = tour[(pos[e] + step) % N]
+                # Gain from closing the gap the segment leaves behind
+                removed = (
+                    hypot(xs[p] - xs[a], ys[p] - ys[a])
+                    + hypot(xs[e] - xs[n], ys[e] - ys[n])
+                    - hypot(xs[p] - xs[n], ys[p] - ys[n])
+                )
+                for c in self.neighbors[a]:
+                    d_ac = hypot(xs[a] - xs[c], ys[a] - ys[c])
+                    if d_ac >= removed:
+                        break
+                    for x, y in (
+                        (c, tour[(pos[c] + step) % N]),
+                        (tour[(pos[c] - step) % N], c),
+                    ):
+                        if x in segment or y in segment or y == p:
+                            continue
+                        d_xy = hypot(xs[x] - xs[y], ys[x] - ys[y])
+                        # x a..e y, or x e..a y
+                        forward = (
+                            hypot(xs[x] - xs[a], ys[x] - ys[a])
+                            + hypot(xs[e] - xs[y], ys[e] - ys[y])
+                            - d_xy
+                        )
+                        backward = (
+                            hypot(xs[x] - xs[e], ys[x] - ys[e])
+                            + hypot(xs[a] - xs[y], ys[a] - ys[y])
+                            - d_xy
+                        )
+                        delta = min(forward, backward) - removed
+                        if delta < -1e-9:
+                            # Relocation as a sequence of 2-opt exchanges
+                            self.exchange(p, a, x, y)
+                            self.exchange(p, x, n, e)
+                            if forward < backward:
+                                self.exchange(x, e, a, y)
+                            self.length += delta
+                            self.moves += 1
+                            self.push(p, n, x, y, a, e)
+                            return True
+        return False
+
+    def variable_depth(self, a):
+        # Chain 2-opt steps from the edge leaving a, greedily keeping the
+        # partial gain positive, and stop at the first chain that closes with
+        # a shorter tour. Chains that never do are undone.
+        tour, pos, xs, ys = self.tour, self.pos, self.xs, self.ys
+        N = len(tour)
+        for step in (1, -1):
+            t1 = a
+            t2 = tour[(pos[t1] + step) % N]
+            gain = hypot(xs[t1] - xs[t2], ys[t1] - ys[t2])
+            applied = []
+            added = set()
+            for _ in range(max_depth):
+                # Direction from t2 back to t1 in the current tour
+                back = 1 if tour[(pos[t2] + 1) % N] == t1 else -1
+                best = None
+                for t3 in self.neighbors[t2]:
+                    g = gain - hypot(xs[t2] - xs[t3], ys[t2] - ys[t3])
+                    if g <= 0:
+                        break
+                    t4 = tour[(pos[t3] + back) % N]
+                    if t3 == t1 or t4 == t2 or (min(t3, t4), max(t3, t4)) in added:
+                        continue
+                    g += hypot(xs[t3] - xs[t4], ys[t3] - ys[t4])
+                    if best is None or g > best[0]:
+                        best = (g, t3, t4)
+                if best is None:
+                    break
+                g, t3, t4 = best
+                self.exchange(t2, t1, t3, t4)
+                applied.append((t2, t1, t3, t4))
+                added.add((min(t2, t3), max(t2, t3)))
+                closed = g - hypot(xs[t4] - xs[t1], ys[t4] - ys[t1])
+                if closed > 1e-9:
+                    self.length -= closed
+                    self.moves += 1
+                    for move in applied:
+                        self.push(*move)
+                    return True
+                gain, t2 = g, t4
+            for u, v, w, z in reversed(applied):
+                self.exchange(u, w, v, z)
+        return False
+
+    def improve_city(self, a):
+        if self.two_opt(a):
+            return True
+        if self.method != "2-opt" and self.or_opt(a):
+            return True
+        return self.method == "Or-3opt" and self.variable_depth(a)
+
+    def step(self):
+        # One time slice of search; True once the tour is a local optimum
+        self.iteration += 1
+        return self.improve(search_time_slice)
+
+    def improve(self, time_limit=None):
+        # Apply improving moves until no city can be improved or time_limit
+        # seconds have passed. Returns True once the tour is a local optimum.
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        queue, queued = self.queue, self.queued
+        checked = 0
+        while queue:
+            a = queue.popleft()
+            queued[a] = False
+            self.improve_city(a)
+            checked += 1
+            if deadline is not None and checked % 256 == 0:
+                if time.perf_counter() >= deadline:
+                    return False
+        return True
+
+
+class AntColony:
+    # MAX-MIN ant system over candidate lists: pheromone is only kept for
+    # each city's ant_candidates nearest neighbors and stays in
+    # [tau_min, tau_max]. `tour` is an optional incumbent to improve on.
+    def __init__(self, coords, dist=None, tour=None, workers=ant_workers):
+        self.coords = coords
+        self.dist = dist
+        # Spawning and feeding processes only pays off on large instances,
+        # and only when each worker gets several ants
+        if len(coords) < ant_pool_min_cities:
+            workers = 1
+        self.workers = min(workers, max(ant_count // min_ants_per_task, 1))
+        self.neighbors = nearest_neighbors(coords, ant_candidates)
+        diff = coords[self.neighbors] - coords[:, np.newaxis]
+        lengths = np.maximum(np.hypot(diff[..., 0], diff[..., 1]), 1e-9)
+        self.visibility = (1.0 / lengths) ** beta  # eta^beta, fixed for the instance
+        # Bounds start from a nearest-neighbor tour, as in MAX-MIN
+        greedy = nearest_neighbor_tour(coords, self.neighbors)
+        reference = float(measure_tours(coords, dist, greedy))
+        self.tour = None
+        self.length = np.inf
+        if tour is not None:
+            self.tour = list(tour)
+            self.length = float(measure_tours(coords, dist, self.tour))
+        self.update_bounds(min(reference, self.length))
+        self.pheromone = np.full(self.neighbors.shape, self.tau_max)
+        self.update_choice()
+        self.seed_sequence = np.random.SeedSequence()
+        self.pool = None  # Started on first use, see close()
+        self.iteration = 0
+        self.stagnant_iterations = 0  # For convergence check
+
+    def close(self):
+        # Stop the worker processes; the next step() starts new ones
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def update_bounds(self, best_distance):
+        self.tau_max = 1.0 / (evaporation * best_distance)
+        root = pbest ** (1.0 / len(self.coords))
+        choices = max(self.neighbors.shape[1] / 2 - 1, 1)
+        self.tau_min = min(self.tau_max * (1 - root) / (choices * root), self.tau_max)
+
+    def update_choice(self):
+        # tau^alpha * eta^beta for every candidate edge, once per iteration
+        self.choice = self.pheromone**alpha * self.visibility
+
+    def construct_ant_tours(self):
+        if self.workers <= 1:
+            rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+            return construct_tours(
+                self.coords, self.neighbors, self.choice, rng, ant_count
+            )
+        if self.pool is None:
+            # spawn keeps workers independent of the Tk process state
+            self.pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_ant_worker,
+                initargs=(self.coords, self.neighbors),
+            )
+        counts = [len(c) for c in np.array_split(range(ant_count), self.workers)]
+        counts = [count for count in counts if count > 0]
+        seeds = self.seed_sequence.spawn(len(counts))
+        futures = [
+            self.pool.submit(construct_tours_worker, self.choice, seed, count)
+            for seed, count in zip(seeds, counts)
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+    def step(self):
+        # One iteration; True once the colony has converged or run out
+        all_tours = self.construct_ant_tours()
+        all_distances = measure_tours(self.coords, self.dist, all_tours)
+        best = int(np.argmin(all_distances))
+        if all_distances[best] < self.length:
+            self.length = float(all_distances[best])
+            self.tour = all_tours[best].tolist()
+            self.stagnant_iterations = 0  # Reset stagnation counter
+        else:
+            self.stagnant_iterations += 1  # No improvement in this iteration
+        self.update_pheromones(all_tours, all_distances)
+        self.iteration += 1
+        return (
+            self.iteration >= max_iterations
+            or self.stagnant_iterations >= stagnation_limit
+        )
+
+    def update_pheromones(self, all_tours, all_distances):
+        # Evaporate, let the iteration's best ant deposit 1 / length on both
+        # directions of its edges, then clamp to the MAX-MIN bounds
+        self.update_bounds(self.length)
+        self.pheromone *= 1 - evaporation
+        best = int(np.argmin(all_distances))
+        tour = all_tours[best]
+        following = np.roll(tour, -1)
+        for from_cities, to_cities in ((tour, following), (following, tour)):
+            # Edges outside the candidate lists carry no pheromone
+            hits = self.neighbors[from_cities] == to_cities[:, np.newaxis]
+            rows = hits.any(axis=1)
+            self.pheromone[from_cities[rows], hits[rows].argmax(axis=1)] += (
+                1.0 / all_distances[best]
+            )
+        np.clip(self.pheromone, self.tau_min, self.tau_max, out=self.pheromone)
+        self.update_choice()
+
+
+class GeneticAlgorithm:
+    # Generational GA over a (population_size, N) array of tours. `tour` is
+    # an optional incumbent added to the random initial population.
+    def __init__(self, coords, dist=None, tour=None, rng=None):
+        self.coords = coords
+        self.dist = dist
+        self.rng = np.random.default_rng(rng)
+        N = len(coords)
+        self.population = self.rng.permuted(
+            np.tile(np.arange(N), (population_size, 1)), axis=1
+        )
+        if tour is not None:
+            self.population[0] = tour
+        self.distances = measure_tours(coords, dist, self.population)
+        best = int(np.argmin(self.distances))
+        self.length = float(self.distances[best])
+        self.tour = self.population[best].tolist()
+        self.iteration = 0
+
+    def step(self):
+        # One generation; True once ga_iterations have run
+        fitness_scores = 1.0 / self.distances
+
+        # Elitism
+        elites = np.argsort(self.distances)[:elitism_count]
+        num_children = population_size - len(elites)
+
+        # Selection and Crossover
+        parents = self.select_tours(fitness_scores, (num_children + 1) // 2 * 2)
+        children = self.crossover(
+            self.population[parents[0::2]], self.population[parents[1::2]]
+        )[:num_children]
+        self.mutate(children)
+        self.population = np.concatenate([self.population[elites], children])
+
+        # Calculate fitness (inverse of distance) for all tours at once
+        self.distances = measure_tours(self.coords, self.dist, self.population)
+        best = int(np.argmin(self.distances))
+        if self.distances[best] < self.length:
+            self.length = float(self.distances[best])
+            self.tour = self.population[best].tolist()
+        self.iteration += 1
+        return self.iteration >= ga_iterations
+
+    def select_tours(self, fitness_scores, count):
+        # Indices of `count` parents drawn in one go
+        if selection_method == "tournament":
+            contenders = self.rng.integers(
+                len(fitness_scores), size=(count, tournament_size)
+            )
+            winners = np.argmax(fitness_scores[contenders], axis=1)
+            return contenders[np.arange(count), winners]
+        # Roulette: cumulative weights once per generation, then a binary
+        # search per pick
+        cumulative = np.cumsum(fitness_scores)
+        picks = np.searchsorted(
+            cumulative, self.rng.random(count) * cumulative[-1], side="right"
+        )
+        return np.minimum(picks, len(fitness_scores) - 1)  # In case of rounding
+
+    def crossover(self, parents1, parents2):
+        # Children of every pair at once; pairs that skip crossover are copied
+        pairs, N = parents1.shape
+        first = self.rng.integers(N, size=pairs)
+        second = (first + self.rng.integers(1, N, size=pairs)) % N
+        starts, ends = np.minimum(first, second), np.maximum(first, second)
+        operator = pmx_crossover if crossover_method == "PMX" else order_crossover
+        children1 = operator(parents1, parents2, starts, ends)
+        children2 = operator(parents2, parents1, starts, ends)
+        copy = self.rng.random(pairs) >= crossover_rate
+        children1[copy] = parents1[copy]
+        children2[copy] = parents2[copy]
+        return np.concatenate([children1, children2])
+
+    def mutate(self, population):
+        # Swap two random cities in each tour picked with mutation_rate
+        rows = np.flatnonzero(self.rng.random(len(population)) < mutation_rate)
+        N = population.shape[1]
+        i = self.rng.integers(N, size=len(rows))
+        j = (i + self.rng.integers(1, N, size=len(rows))) % N
+        population[rows, i], population[rows, j] = (
+            population[rows, j],
+            population[rows, i],
+        )
+
+
+class LatestState:
+    # Single-slot mailbox: the solver thread overwrites the slot with its
+    # latest state and the UI takes whatever is there when it redraws, so
+    # intermediate states are dropped instead of queueing up
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def publish(self, state):
+        with self._lock:
+            self._state = state
+
+    def take(self):
+        with self._lock:
+            state, self._state = self._state, None
+        return state
+
+
 class UI(tk.Tk):
     def __init__(self):
         tk.Tk.__init__(self)
@@ -76,14 +698,30 @@ class UI(tk.Tk):
 
         self.cities_list = []
         self.edges_list = []
+        self.coords = None  # (N, 2) array of city positions
+        self.dist = None  # (N, N) distance matrix, None for large instances
+        self.neighbors = None  # Nearest-neighbor candidate lists
         self.tour = []
         self.best_distance = None
         self.iteration = 0
-        self.stagnant_iterations = 0  # For convergence check
-        self.optimizing = False  # Flag to control optimization loop
+        self.optimizing = False  # True while a solver thread is running
         self.algorithm = "2-opt"  # Default algorithm
-        self.pheromone = {}  # Pheromone levels for ACO
-        self.population = []  # Population for GA
+        # The solver runs on its own thread and is only touched there while
+        # running. It publishes snapshots of its best tour to the mailbox,
+        # and setting stop_event ends the run after the current step.
+        self.solver = None  # LocalSearch, AntColony or GeneticAlgorithm
+        self.solver_thread = None
+        # The solver the thread is stepping, guarded by solver_lock so that
+        # exactly one side closes a discarded ant colony
+        self.running_solver = None
+        self.solver_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.mailbox = LatestState()
+        self.render_job = None  # Pending render_frame callback
+        # The tour is one persistent polyline; shown_edges holds the edges
+        # it had at the last redraw so changed ones can be highlighted
+        self.tour_line = None
+        self.shown_edges = None
         self.status_label = tk.Label(self, text="Distance: 0.00")
         self.status_label.place(x=10, y=10)
 
@@ -92,6 +730,12 @@ class UI(tk.Tk):
         self.radio_2opt = tk.Radiobutton(
             self, text="2-opt", variable=self.algorithm_var, value="2-opt"
         )
+        self.radio_oropt = tk.Radiobutton(
+            self, text="Or-opt", variable=self.algorithm_var, value="Or-opt"
+        )
+        self.radio_or3opt = tk.Radiobutton(
+            self, text="Or-3opt", variable=self.algorithm_var, value="Or-3opt"
+        )
         self.radio_aco = tk.Radiobutton(
             self, text="ACO", variable=self.algorithm_var, value="ACO"
         )
@@ -99,43 +743,52 @@ class UI(tk.Tk):
             self, text="GA", variable=self.algorithm_var, value="GA"
         )
         self.radio_2opt.place(x=10, y=40)
-        self.radio_aco.place(x=70, y=40)
-        self.radio_ga.place(x=130, y=40)
+        self.radio_oropt.place(x=70, y=40)
+        self.radio_or3opt.place(x=140, y=40)
+        self.radio_aco.place(x=220, y=40)
+        self.radio_ga.place(x=280, y=40)
 
         # Solve button
         self.solve_button = tk.Button(
             self, text="Solve", command=self.start_optimization
         )
-        self.solve_button.place(x=200, y=38)
+        self.solve_button.place(x=340, y=38)
 
         def generate_cities():
+            self.stop_solver()
+            self.discard_solver()  # A paused solver belongs to the old cities
             self.cities_list.clear()
             self.edges_list.clear()
-            self.tour.clear()
+            self.tour = []
             self.best_distance = None
             self.iteration = 0
-            self.stagnant_iterations = 0
-            self.optimizing = False
             self.algorithm = self.algorithm_var.get()
-            self.pheromone.clear()
-            self.population.clear()
+            self.neighbors = None
             # Generate cities
             for idx in range(num_cities):
                 x = random.randint(padding, w)
                 y = random.randint(padding, h)
                 node = Node(x, y, idx)
                 self.cities_list.append(node)
-            # Generate all possible edges
+            self.coords = np.array([(n.x, n.y) for n in self.cities_list], dtype=float)
             N = len(self.cities_list)
-            for i in range(N):
+            self.dist = (
+                distance_matrix(self.coords) if N <= dense_matrix_limit else None
+            )
+            # Generate all possible edges
+            for i in range(N if N <= max_edge_cities else 0):
                 for j in range(i + 1, N):
-                    edge = Edge(self.cities_list[i], self.cities_list[j])
+                    edge = Edge(
+                        self.cities_list[i], self.cities_list[j], self.dist[i, j]
+                    )
                     self.edges_list.append(edge)
             draw_cities()
             # Do not initialize the tour or draw it here
 
         def draw_cities():
             self.canvas.delete("all")
+            self.tour_line = None
+            self.shown_edges = None
             # Draw all edges as dotted black lines
             for edge in self.edges_list:
                 edge.draw(self.canvas, color="black", dash=(2, 4))
@@ -167,312 +820,185 @@ class UI(tk.Tk):
 
         self.mainloop()
 
-    def initialize_tour(self):
-        self.tour = list(range(len(self.cities_list)))  # Initial tour in order
+    def initialize_tour(self, greedy=False):
+        if greedy:
+            # Local search converges much faster from a nearest-neighbor tour
+            self.tour = nearest_neighbor_tour(self.coords, self.get_neighbors())
+        else:
+            self.tour = list(range(len(self.cities_list)))  # Initial tour in order
         self.best_distance = self.calculate_tour_distance(self.tour)
         self.iteration = 0
-        self.stagnant_iterations = 0
 
-    def calculate_tour_distance(self, tour):
-        distance = 0
-        N = len(tour)
-        for i in range(N):
-            a = self.cities_list[tour[i]]
-            b = self.cities_list[tour[(i + 1) % N]]
-            dx = a.x - b.x
-            dy = a.y - b.y
-            distance += math.hypot(dx, dy)
-        return distance
-
-    def start_optimization(self):
-        if not self.optimizing:
-            self.algorithm = self.algorithm_var.get()
-            if not self.tour:
-                if self.algorithm == "GA":
-                    self.initialize_population()
-                else:
-                    self.initialize_tour()
-            self.optimizing = True
-            if self.algorithm == "2-opt":
-                self.draw_current_tour()
-                self.two_opt_iteration()
-            elif self.algorithm == "ACO":
-                self.initialize_pheromone()
-                self.draw_current_tour()
-                self.aco_iteration()
-            elif self.algorithm == "GA":
-                self.draw_current_tour()
-                self.ga_iteration()
+    def initialize_population(self):
+        self.solver = GeneticAlgorithm(self.coords, self.dist)
+        self.tour = self.solver.tour
+        self.best_distance = self.solver.length
+        self.iteration = 0
 
-    def pause_optimization(self):
-        self.optimizing = False
+    def get_neighbors(self):
+        if self.neighbors is None:
+            self.neighbors = nearest_neighbors(self.coords, num_neighbors)
+        return self.neighbors
 
-    def reset_tour(self):
-        if self.algorithm == "GA":
-            self.initialize_population()
-        else:
-            self.initialize_tour()
-        self.draw_current_tour()
+    def calculate_tour_distance(self, tour):
+        return float(measure_tours(self.coords, self.dist, tour))
 
-    def two_opt_iteration(self):
-        if not self.optimizing or self.algorithm != "2-opt":
+    def start_optimization(self):
+        if self.optimizing or not self.cities_list:
             return
-        improved = False
-        N = len(self.tour)
-        for i in range(N - 1):
-            for j in range(i + 2, N):
-                if j == N - 1 and i == 0:
-                    continue  # Do not reverse the entire tour
-                # Calculate the change in distance
-                a, b = (
-                    self.cities_list[self.tour[i]],
-                    self.cities_list[self.tour[i + 1]],
-                )
-                c, d = (
-                    self.cities_list[self.tour[j]],
-                    self.cities_list[self.tour[(j + 1) % N]],
-                )
-                delta = (
-                    -math.hypot(a.x - b.x, a.y - b.y)
-                    - math.hypot(c.x - d.x, c.y - d.y)
-                    + math.hypot(a.x - c.x, a.y - c.y)
-                    + math.hypot(b.x - d.x, b.y - d.y)
-                )
-                if delta < -1e-6:
-                    # Perform the 2-opt swap
-                    new_tour = (
-                        self.tour[: i + 1]
-                        + self.tour[i + 1 : j + 1][::-1]
-                        + self.tour[j + 1 :]
+        self.algorithm = self.algorithm_var.get()
+        if self.solver_thread is not None:
+            # A paused run may still be finishing its last step
+            self.solver_thread.join()
+        if not self.tour:
+            if self.algorithm == "GA":
+                self.initialize_population()
+            else:
+                self.initialize_tour(greedy=self.algorithm in local_search_methods)
+        # A paused GA or ACO run carries on; anything else starts from the
+        # current tour
+        resumes = (self.algorithm == "ACO" and isinstance(self.solver, AntColony)) or (
+            self.algorithm == "GA" and isinstance(self.solver, GeneticAlgorithm)
+        )
+        if not resumes:
+            self.discard_solver()
+        if self.algorithm in local_search_methods:
+            self.solver = LocalSearch(
+                self.coords, self.tour, self.get_neighbors(), self.algorithm
+            )
+        elif self.algorithm == "ACO" and not resumes:
+            self.solver = AntColony(self.coords, self.dist, self.tour)
+        elif self.algorithm == "GA" and not resumes:
+            self.solver = GeneticAlgorithm(self.coords, self.dist, self.tour)
+        self.optimizing = True
+        self.stop_event = threading.Event()
+        self.mailbox = LatestState()
+        self.running_solver = self.solver
+        self.solver_thread = threading.Thread(
+            target=self.solve,
+            args=(self.algorithm, self.solver, self.stop_event, self.mailbox),
+            daemon=True,
+        )
+        self.solver_thread.start()
+        self.draw_current_tour()
+        if self.render_job is not None:
+            self.after_cancel(self.render_job)
+        self.render_frame()
+
+    def solve(self, algorithm, solver, stop_event, mailbox):
+        # Runs on the solver thread. Publishes a snapshot whenever the best
+        # tour improves, and a final one when the run ends.
+        best = np.inf
+        finished = False
+        try:
+            while not stop_event.is_set() and not finished:
+                finished = solver.step()
+                if solver.length < best - 1e-9:
+                    best = solver.length
+                    mailbox.publish(
+                        (solver.iteration, solver.length, list(solver.tour))
                     )
-                    self.tour = new_tour
-                    self.best_distance += delta
-                    improved = True
-                    self.stagnant_iterations = 0  # Reset stagnation counter
-                    self.draw_current_tour()
-                    break
-            if improved:
-                break
-        self.iteration += 1
-        if improved:
-            self.after(1, self.two_opt_iteration)
-        else:
-            self.optimizing = False
+        finally:
+            with self.solver_lock:
+                self.running_solver = None
+                abandoned = solver is not self.solver
+            # A paused colony keeps its worker processes for the next run
+            if isinstance(solver, AntColony) and (finished or abandoned):
+                solver.close()
+        if solver.tour is not None:
+            mailbox.publish((solver.iteration, solver.length, list(solver.tour)))
+        if finished:
             print(
-                "2-opt Optimization finished after {} iterations".format(self.iteration)
+                "{} Optimization finished after {} iterations".format(
+                    algorithm, solver.iteration
+                )
             )
-            print("Best distance: {:.2f}".format(self.best_distance))
-
-    # ACO-specific methods
-    def initialize_pheromone(self):
-        self.pheromone.clear()
-        N = len(self.cities_list)
-        initial_pheromone = 1.0
-        for i in range(N):
-            for j in range(N):
-                if i != j:
-                    self.pheromone[(i, j)] = initial_pheromone
-
-    def aco_iteration(self):
-        if not self.optimizing or self.algorithm != "ACO":
-            return
-        N = len(self.cities_list)
-        all_tours = []
-        all_distances = []
-        best_iteration_distance = None
-        for ant in range(ant_count):
-            tour = self.construct_solution()
-            distance = self.calculate_tour_distance(tour)
-            all_tours.append(tour)
-            all_distances.append(distance)
-            if self.best_distance is None or distance < self.best_distance:
-                self.best_distance = distance
-                self.tour = tour
-                self.draw_current_tour()
-                self.stagnant_iterations = 0  # Reset stagnation counter
-            if best_iteration_distance is None or distance < best_iteration_distance:
-                best_iteration_distance = distance
-        else:
-            self.stagnant_iterations += 1  # No improvement in this iteration
-        self.update_pheromones(all_tours, all_distances)
-        self.iteration += 1
-        if (
-            self.iteration < max_iterations
-            and self.stagnant_iterations < stagnation_limit
-        ):
-            self.after(1, self.aco_iteration)
+            print("Best distance: {:.2f}".format(solver.length))
+
+    def render_frame(self):
+        # Runs on the Tk main loop at frame_rate until the solver thread
+        # ends. Checking the thread before taking the state guarantees its
+        # last snapshot is drawn.
+        self.render_job = None
+        running = self.solver_thread.is_alive()
+        state = self.mailbox.take()
+        if state is not None:
+            self.iteration, self.best_distance, self.tour = state
+            self.draw_current_tour()
+        if running:
+            self.render_job = self.after(int(1000 / frame_rate), self.render_frame)
         else:
             self.optimizing = False
-            print(
-                "ACO Optimization finished after {} iterations".format(self.iteration)
-            )
-            print("Best distance: {:.2f}".format(self.best_distance))
-
-    def construct_solution(self):
-        N = len(self.cities_list)
-        unvisited = set(range(N))
-        current_city = random.choice(tuple(unvisited))
-        tour = [current_city]
-        unvisited.remove(current_city)
-        while unvisited:
-            probabilities = []
-            total = 0.0
-            for city in unvisited:
-                tau = self.pheromone[(current_city, city)] ** alpha
-                eta = (1.0 / self.distance(current_city, city)) ** beta
-                prob = tau * eta
-                probabilities.append((city, prob))
-                total += prob
-            # Normalize probabilities
-            probabilities = [(city, prob / total) for city, prob in probabilities]
-            # Choose next city based on probability
-            rand = random.uniform(0, 1)
-            cumulative = 0.0
-            for city, prob in probabilities:
-                cumulative += prob
-                if cumulative >= rand:
-                    next_city = city
-                    break
-            else:
-                next_city = probabilities[-1][0]  # In case of rounding errors
-            tour.append(next_city)
-            unvisited.remove(next_city)
-            current_city = next_city
-        return tour
-
-    def update_pheromones(self, all_tours, all_distances):
-        # Evaporate pheromones
-        for key in self.pheromone:
-            self.pheromone[key] *= 1 - evaporation
-            if self.pheromone[key] < 1e-6:  # Avoid pheromone levels dropping to zero
-                self.pheromone[key] = 1e-6
-        # Deposit new pheromones
-        for tour, distance in zip(all_tours, all_distances):
-            pheromone_deposit = 1.0 / distance
-            for i in range(len(tour)):
-                from_city = tour[i]
-                to_city = tour[(i + 1) % len(tour)]
-                self.pheromone[(from_city, to_city)] += pheromone_deposit
-                self.pheromone[
-                    (to_city, from_city)
-                ] += pheromone_deposit  # Assuming symmetric TSP
-
-    # GA-specific methods
-    def initialize_population(self):
-        self.population.clear()
-        N = len(self.cities_list)
-        self.best_distance = None
-        self.tour = None
-        for _ in range(population_size):
-            tour = list(range(N))
-            random.shuffle(tour)
-            distance = self.calculate_tour_distance(tour)
-            if self.best_distance is None or distance < self.best_distance:
-                self.best_distance = distance
-                self.tour = tour
-            self.population.append(tour)
-        self.iteration = 0
+            if isinstance(self.solver, LocalSearch):
+                self.solver = None  # Rebuilt from the tour on the next start
+
+    def discard_solver(self):
+        # Forget the current solver. An ant colony's worker processes are
+        # shut down here, or by its thread if it is still finishing a step.
+        with self.solver_lock:
+            solver, self.solver = self.solver, None
+            running = solver is not None and solver is self.running_solver
+        if isinstance(solver, AntColony) and not running:
+            solver.close()
+
+    def stop_solver(self):
+        # Takes effect immediately for the UI: snapshots still in flight go
+        # to the old mailbox and are never drawn
+        self.stop_event.set()
+        self.mailbox = LatestState()
+        self.optimizing = False
 
-    def ga_iteration(self):
-        if not self.optimizing or self.algorithm != "GA":
-            return
-        new_population = []
-        fitness_scores = []
-        total_fitness = 0.0
-
-        # Calculate fitness scores (inverse of distance)
-        for tour in self.population:
-            distance = self.calculate_tour_distance(tour)
-            fitness = 1.0 / distance
-            fitness_scores.append(fitness)
-            total_fitness += fitness
-            if distance < self.best_distance:
-                self.best_distance = distance
-                self.tour = tour[:]
+    def pause_optimization(self):
+        if self.optimizing:
+            # Keep whatever the solver has reached
+            state = self.mailbox.take()
+            if state is not None:
+                self.iteration, self.best_distance, self.tour = state
                 self.draw_current_tour()
+        self.stop_solver()
 
-        # Normalize fitness scores
-        probabilities = [fitness / total_fitness for fitness in fitness_scores]
-
-        # Selection and Crossover
-        for _ in range(population_size // 2):
-            parent1 = self.select_tour(probabilities)
-            parent2 = self.select_tour(probabilities)
-            if random.random() < crossover_rate:
-                child1, child2 = self.crossover(parent1, parent2)
-            else:
-                child1, child2 = parent1[:], parent2[:]
-            # Mutation
-            if random.random() < mutation_rate:
-                self.mutate(child1)
-            if random.random() < mutation_rate:
-                self.mutate(child2)
-            new_population.extend([child1, child2])
-
-        self.population = new_population
-        self.iteration += 1
-        if self.iteration < ga_iterations:
-            self.after(1, self.ga_iteration)
+    def reset_tour(self):
+        self.stop_solver()
+        self.discard_solver()
+        if not self.cities_list:
+            return
+        if self.algorithm == "GA":
+            self.initialize_population()
         else:
-            self.optimizing = False
-            print("GA Optimization finished after {} iterations".format(self.iteration))
-            print("Best distance: {:.2f}".format(self.best_distance))
-
-    def select_tour(self, probabilities):
-        rand = random.uniform(0, 1)
-        cumulative = 0.0
-        for tour, prob in zip(self.population, probabilities):
-            cumulative += prob
-            if cumulative >= rand:
-                return tour
-        return self.population[-1]  # In case of rounding errors
-
-    def crossover(self, parent1, parent2):
-        N = len(parent1)
-        start, end = sorted(random.sample(range(N), 2))
-        child1 = [None] * N
-        child1[start : end + 1] = parent1[start : end + 1]
-        pointer = 0
-        for city in parent2:
-            if city not in child1:
-                while child1[pointer] is not None:
-                    pointer += 1
-                child1[pointer] = city
-
-        child2 = [None] * N
-        child2[start : end + 1] = parent2[start : end + 1]
-        pointer = 0
-        for city in parent1:
-            if city not in child2:
-                while child2[pointer] is not None:
-                    pointer += 1
-                child2[pointer] = city
-
-        return child1, child2
-
-    def mutate(self, tour):
-        i, j = random.sample(range(len(tour)), 2)
-        tour[i], tour[j] = tour[j], tour[i]
-
-    def distance(self, city_index1, city_index2):
-        a = self.cities_list[city_index1]
-        b = self.cities_list[city_index2]
-        return math.hypot(a.x - b.x, a.y - b.y)
+            self.initialize_tour(greedy=self.algorithm in local_search_methods)
+        self.draw_current_tour()
 
     def draw_current_tour(self):
         if self.best_distance is None or self.tour is None:
             return  # Do not draw if no tour is available
-        self.canvas.delete("tour")
-        N = len(self.tour)
-        for i in range(N):
-            a = self.cities_list[self.tour[i]]
-            b = self.cities_list[self.tour[(i + 1) % N]]
-            self.canvas.create_line(
-                a.x, a.y, b.x, b.y, fill="red", width=2, tags="tour"
+        # Update the polyline's points in one call, however many changed
+        tour = np.asarray(self.tour)
+        closed = np.append(tour, tour[0])
+        points = self.coords[closed].ravel().tolist()
+        if self.tour_line is None:
+            self.tour_line = self.canvas.create_line(
+                *points, fill="red", width=2, tags="tour"
             )
+        else:
+            self.canvas.coords(self.tour_line, points)
+        self.highlight_changes(tour)
         # No need to redraw cities or edges; they are already drawn
         self.status_label.config(text="Distance: {:.2f}".format(self.best_distance))
-        self.canvas.update()
+
+    def highlight_changes(self, tour):
+        # Edges are keyed by their city pair regardless of direction
+        N = len(tour)
+        following = np.roll(tour, -1)
+        edges = np.minimum(tour, following) * N + np.maximum(tour, following)
+        self.canvas.delete("changed")
+        if self.shown_edges is not None and len(self.shown_edges) == len(edges):
+            new = np.flatnonzero(~np.isin(edges, self.shown_edges))
+            for i in new[:max_highlighted_edges]:
+                a, b = self.coords[tour[i]], self.coords[following[i]]
+                self.canvas.create_line(
+                    a[0], a[1], b[0], b[1], fill="orange", width=3, tags="changed"
+                )
+        self.shown_edges = edges
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+import TravelingSalesman
+
+sizes = [100, 1000, 10000]
+seeds = [0, 1, 2]
+methods = list(TravelingSalesman.local_search_methods)
+time_limit = 10.0  # Seconds allowed per run
+sample_interval = 0.05  # Seconds of search between samples of the curve
+field_size = 1000  # Cities are placed uniformly in a square of this size
+
+fields = [
+    "method",
+    "num_cities",
+    "seed",
+    "elapsed",
+    "length",
+    "gap",
+    "moves",
+    "converged",
+]
+
+
+def generate_coords(num_cities, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, field_size, (num_cities, 2))
+
+
+def run_curve(method, coords, neighbors, start_tour, limit):
+    # Runs one local search from start_tour and samples (elapsed, length,
+    # moves, converged) every sample_interval seconds of search
+    search = TravelingSalesman.LocalSearch(coords, start_tour, neighbors, method)
+    curve = [(0.0, search.length, 0, False)]
+    elapsed = 0.0
+    converged = False
+    while not converged and elapsed < limit:
+        start = time.perf_counter()
+        converged = search.improve(min(sample_interval, limit - elapsed))
+        elapsed += time.perf_counter() - start
+        curve.append((elapsed, search.length, search.moves, converged))
+    return curve
+
+
+def benchmark(methods=methods, sizes=sizes, seeds=seeds, limit=time_limit):
+    # Yields one row per sample of every quality-vs-time curve. All methods
+    # start from the same nearest-neighbor tour of the same instance, and
+    # gap is measured against the best length any method reached on it.
+    for num_cities in sizes:
+        for seed in seeds:
+            coords = generate_coords(num_cities, seed)
+            neighbors = TravelingSalesman.nearest_neighbors(
+                coords, TravelingSalesman.num_neighbors
+            )
+            start_tour = TravelingSalesman.nearest_neighbor_tour(coords, neighbors)
+            curves = {
+                method: run_curve(method, coords, neighbors, start_tour, limit)
+                for method in methods
+            }
+            best = min(curve[-1][1] for curve in curves.values())
+            for method, curve in curves.items():
+                for elapsed, length, moves, converged in curve:
+                    yield {
+                        "method": method,
+                        "num_cities": num_cities,
+                        "seed": seed,
+                        "elapsed": elapsed,
+                        "length": length,
+                        "gap": length / best - 1,
+                        "moves": moves,
+                        "converged": converged,
+                    }
+
+
+def write_rows(rows, path):
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+    else:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Quality-vs-time benchmark of the TSP local searches."
+    )
+    parser.add_argument("--methods", nargs="+", choices=methods, default=methods)
+    parser.add_argument("--sizes", type=int, nargs="+", default=sizes)
+    parser.add_argument("--seeds", type=int, nargs="+", default=seeds)
+    parser.add_argument("--time-limit", type=float, default=time_limit)
+    parser.add_argument("--output", help="write the curves to a .csv or .json file")
+    args = parser.parse_args(argv)
+
+    rows = list(benchmark(args.methods, args.sizes, args.seeds, args.time_limit))
+    # Summarize each curve by its final point
+    final = {}
+    for row in rows:
+        final[row["num_cities"], row["seed"], row["method"]] = row
+    for row in final.values():
+        print(
+            f"n={row['num_cities']:>6} seed={row['seed']} {row['method']:<8} "
+            f"time={row['elapsed']:>7.3f}s length={row['length']:>12.1f} "
+            f"gap={row['gap'] * 100:>6.2f}% moves={row['moves']:>7} "
+            + ("converged" if row["converged"] else "time limit"),
+            file=sys.stderr,
+        )
+    if args.output:
+        write_rows(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()